@@ -3,13 +3,13 @@
 import html
 import re
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 from docutils import nodes
 from docutils.parsers.rst import directives
 from sphinx.util.docutils import SphinxDirective, logger
 
-from .pygments_elcl import ErbslandConfigurationLanguage, DocumentError, Value
+from .pygments_elcl import ErbslandConfigurationLanguage, DocumentError, IncludeResolver, Value, ValueTreeCache
 
 
 class ConfigurationTreeDirective(SphinxDirective):
@@ -17,9 +17,14 @@ class ConfigurationTreeDirective(SphinxDirective):
     optional_arguments = 0
     final_argument_whitespace = False
     has_content = False
-    option_spec = {"highlight-path": directives.unchanged, "hide-content": directives.flag}
+    option_spec = {
+        "highlight-path": directives.unchanged,
+        "hide-content": directives.flag,
+        "resolve-includes": directives.flag,
+    }
 
     lexer = ErbslandConfigurationLanguage()
+    include_lexer = ErbslandConfigurationLanguage(include_resolver=IncludeResolver())
 
     RE_SPLIT_TYPE = re.compile(r"^(\w+)\((.*)\)$")
 
@@ -47,17 +52,30 @@ class ConfigurationTreeDirective(SphinxDirective):
         if highlight_path_str := str(self.options.get("highlight-path", "")).strip():
             highlight_path = self._split_highlight_path(highlight_path_str)
         is_hide_content = "hide-content" in self.options
-        html_content = self.create_html_for_file(path, highlight_path=highlight_path, is_hide_content=is_hide_content)
+        lexer = self.include_lexer if "resolve-includes" in self.options else self.lexer
+        cache = ValueTreeCache(Path(self.env.doctreedir) / "configuration-tree", lexer)
+        html_content = self.create_html_for_file(
+            path, highlight_path=highlight_path, is_hide_content=is_hide_content, cache=cache
+        )
         raw_html = nodes.raw("", html_content, format="html")
         return [raw_html]
 
-    def create_html_for_file(self, path: Path, *, highlight_path: list[str], is_hide_content=False) -> str:
+    def create_html_for_file(
+        self,
+        path: Path,
+        *,
+        highlight_path: list[str],
+        is_hide_content=False,
+        cache: Optional[ValueTreeCache] = None,
+    ) -> str:
         if not path.is_file():
             logger.error(f"File not found: {path}")
             return ""
         try:
-            text = path.read_text(encoding="utf-8")
-            root = self.lexer.get_value_tree(text)
+            if cache:
+                root = cache.get_value_tree(path)
+            else:
+                root = self.lexer.get_value_tree_from_file(path)
         except DocumentError as e:
             logger.error(f"Failed to parse file {path}: {e}")
             return ""
@@ -101,7 +119,7 @@ class ConfigurationTreeDirective(SphinxDirective):
             current_highlight_name = current_highlight_name[1:-1]
         if value.parent and value.parent.is_list():
             if current_highlight_name and not current_highlight_name[0].isdigit():
-                current_highlight_name = f"{len(value.parent.children)-1}"
+                current_highlight_name = f"{value.parent.child_count - 1}"
                 highlight_path = [current_highlight_name, *highlight_path]
         is_highlight = highlight_path and current_highlight_name == value.name
 
@@ -1,10 +1,17 @@
 #  Copyright (c) 2024-2025 Tobias Erbsland - Erbsland DEV. https://erbsland.dev
 #  SPDX-License-Identifier: Apache-2.0
+import bisect
 import datetime
 import enum
+import functools
+import hashlib
+import json
 import math
+import os
 import re
-from typing import Any, Optional, Union, Callable
+import struct
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, TextIO, Union, Callable
 
 from pygments.lexer import bygroups, ExtendedRegexLexer, LexerContext, include
 from pygments.token import (
@@ -23,16 +30,107 @@ from pygments.token import (
 
 
 class DocumentError(Exception):
-    def __init__(self, pos: int, matched_text: str, message: str = ""):
+    def __init__(self, pos: int, matched_text: str, message: str = "", line: int = 0, column: int = 0):
         self.pos = pos
         self.matched_text = matched_text
         self.message = message
+        self.line = line  # The line number, starting with 1, or 0 if the location is unknown.
+        self.column = column  # The column in characters, starting with 1, or 0 if the location is unknown.
+
+    def set_location(self, text: str, line_offset: int = 0, column_offset: int = 0):
+        """
+        Set the line and column from the position of the error in the given text.
+
+        :param line_offset: The number of lines before the text.
+        :param column_offset: The number of characters before the text, on its first line.
+        """
+        line_start = text.rfind("\n", 0, self.pos) + 1
+        self.line = line_offset + text.count("\n", 0, self.pos) + 1
+        self.column = self.pos - line_start + 1 + (column_offset if line_start == 0 else 0)
 
 
 class InternalError(Exception):
     pass
 
 
+ERROR_CODES_PATH = Path(__file__).parent.parent.parent / "data" / "error-codes.json"
+
+# The error categories for the messages of the lexer, in the order they are tested.
+ERROR_NAME_PATTERNS = [
+    ("Indentation", re.compile(r"Indentation pattern")),
+    ("UnexpectedEnd", re.compile(r"end of document|Unmatched open")),
+    ("Encoding", re.compile(r"not valid UTF-8")),
+    ("IO", re.compile(r"does not exist|Could not read")),
+    (
+        "NameConflict",
+        re.compile(r"already|same name|includes itself|conflicts with|cannot mix|Found a (?:text|regular) name"),
+    ),
+    ("LimitExceeded", re.compile(r"exceeds|Too many digits|must not exceed|limited to")),
+    ("Unsupported", re.compile(r"Unsupported language version")),
+    ("Signature", re.compile(r"Signature not supported")),
+    ("Internal", re.compile(r"wrong state|Unsupported state transition|Closed a state|Cannot ")),
+]
+
+
+@functools.cache
+def _error_codes() -> dict[str, int]:
+    """The error codes by name, from the machine-readable list in the `data` directory."""
+    with ERROR_CODES_PATH.open(encoding="utf-8") as file:
+        return {entry["name"]: entry["code"] for entry in json.load(file)}
+
+
+class Diagnostic:
+    """
+    An error in a document, with its location and error code.
+
+    Diagnostics unpack like the tuple `(pos, line, column, code, message)`.
+    """
+
+    __slots__ = ("pos", "line", "column", "code", "message")
+
+    RE_CONTROL_CHARACTER = re.compile(r"[\x00-\x08\x0A-\x1F\x7F-\x9F]")
+
+    def __init__(self, pos: int, line: int, column: int, code: int, message: str):
+        self.pos = pos  # The position of the error in characters.
+        self.line = line  # The line number, starting with 1.
+        self.column = column  # The column in characters, starting with 1.
+        self.code = code  # The error code, from `data/error-codes.json`.
+        self.message = message
+
+    @classmethod
+    def from_error(cls, error: DocumentError, line: int, column: int) -> "Diagnostic":
+        if cls.RE_CONTROL_CHARACTER.match(error.matched_text):
+            name = "Character"
+        else:
+            name = next((name for name, pattern in ERROR_NAME_PATTERNS if pattern.search(error.message)), "Syntax")
+        return cls(error.pos, line, column, _error_codes()[name], error.message)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter((self.pos, self.line, self.column, self.code, self.message))
+
+    def __repr__(self) -> str:
+        return f"Diagnostic({self.pos}, {self.line}, {self.column}, {self.code}, {self.message!r})"
+
+
+class LineOffsetTable:
+    """The start positions of all lines in a document, to map positions to lines and columns."""
+
+    def __init__(self):
+        self.line_starts = [0]
+
+    def add_text(self, text: str, offset: int):
+        """Add the lines from a part of the document, that starts at `offset` and follows all added parts."""
+        pos = text.find("\n")
+        while pos >= 0:
+            self.line_starts.append(offset + pos + 1)
+            pos = text.find("\n", pos + 1)
+
+    def location(self, pos: int) -> tuple[int, int]:
+        """Get the line and column for a position, both starting with 1."""
+        index = bisect.bisect_right(self.line_starts, pos) - 1
+        return index + 1, pos - self.line_starts[index] + 1
+
+
 class NameType(enum.StrEnum):
     """The type of name."""
 
@@ -99,10 +197,17 @@ class EclContext(LexerContext):
         self.section: Optional[Value] = None  # The current section.
         self.absolute_section: Optional[Value] = None  # The absolute section.
         self.value: Optional[Value] = None  # The current value.
-        self.value_text: str = ""  # The current text
-        self.value_data: bytes = b""  # The current data
+        self.value_text_parts: list[str] = []  # The slices of the current text, joined when the text ends.
+        self.value_data = bytearray()  # The current data, converted to bytes when the value ends.
         self.indent_pattern: str = ""  # The current indent pattern.
         self.open_states: list[OpenState] = []  # A state that must be closed
+        self.resolve_includes = False  # If `@include` commands are resolved by the value tree parser.
+        self.pending_include: Optional[Value] = None  # An `@include` command, that waits for its text.
+
+    @property
+    def value_text(self) -> str:
+        """The current text, joined from all slices."""
+        return "".join(self.value_text_parts)
 
     def open_state(self, state: OpenState):
         self.open_states.append(state)
@@ -124,8 +229,13 @@ TEXT_ESCAPE_SUBSTITUTIONS = {
 }
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_name(name: str) -> str:
-    """Normalize regular and text names."""
+    """
+    Normalize regular and text names.
+
+    The same names are normalized many times while a document is parsed, so the results are cached.
+    """
     if name.startswith('"'):  # is text?
         if name == '""':
             raise InternalError(f"An empty text name is not allowed.")
@@ -139,6 +249,8 @@ def normalize_name(name: str) -> str:
 
 def normalize_text(text: str) -> str:
     """Normalize text, by resolving escape characters."""
+    if "\\" not in text:
+        return text  # Nothing to resolve.
 
     def replace(match: re.Match):
         result = match.group(0)
@@ -156,7 +268,19 @@ def normalize_text(text: str) -> str:
 
 
 class Value:
-    """One single value in the data model."""
+    """
+    One single value in the data model.
+
+    A value only stores its name and a pointer to its parent. The name path is built on first access from the
+    path of the parent, and kept as a tuple that is shared by the prefixes of all child paths.
+
+    All values of a tree share one path index, owned by the root, that maps name paths to values. It is updated
+    as values are added, so `value_by_path` on the root needs a single lookup.
+    """
+
+    __slots__ = ("_name", "_type", "_parent", "_data", "_children", "_path", "_index", "_display_order")
+
+    RE_NAME_PATH_ELEMENT = re.compile(r'"(?:[^"\\]|\\.)*"|\[(\d+)\]|[^.\[\]]+')
 
     RE_OUTCOME_ESCAPE = re.compile(r"[\\\".=\x00-\x1F\u007F-]")
 
@@ -165,8 +289,11 @@ class Value:
         self._type = value_type
         self._parent: Optional["Value"] = parent
         self._data = data
-        self._children: Union[dict[str, "Value"], list["Value"], None] = None
-        self._path: list[str] = self._create_path()
+        self._children: Union[dict[str, "Value"], list["Value"], None]
+        self._path: Optional[tuple[str, ...]] = None  # The name path, built on first access.
+        # The path index of the tree, shared by all values.
+        self._index: dict[tuple[str, ...], "Value"] = parent._index if parent is not None else {}
+        self._display_order: Optional[tuple["Value", ...]] = None  # Cached children in display order.
         match value_type:
             case ValueType.VALUE_LIST | ValueType.SECTION_LIST:
                 self._children = []
@@ -182,11 +309,13 @@ class Value:
         if parent:
             self._parent._add_value(self)
 
-    def _create_path(self) -> list[str]:
-        if self._parent:
-            return self._parent._path + [self._name]
-        else:
-            return [self._name] if self._name else []
+    def _get_path(self) -> tuple[str, ...]:
+        if self._path is None:
+            if self._parent is not None:
+                self._path = self._parent._get_path() + (self._name,)
+            else:
+                self._path = (self._name,) if self._name else ()
+        return self._path
 
     @staticmethod
     def _escape_text(match: re.Match):
@@ -209,9 +338,9 @@ class Value:
             case ValueType.UNDEF:
                 text = ""
             case ValueType.INTEGER | ValueType.FLOAT:
-                text = str(self._data)
+                text = str(self.data)
             case ValueType.BOOLEAN:
-                text = "true" if self._data else "false"
+                text = "true" if self.data else "false"
             case ValueType.TEXT:
                 text = '"' + self.RE_OUTCOME_ESCAPE.sub(self._escape_text, str(self._data)) + '"'
             case ValueType.BYTES:
@@ -241,15 +370,78 @@ class Value:
         if new_value.has_text_name and self._type == ValueType.SECTION_WITH_NAMES:
             # Switch the map type if required. No validity check at this point!
             self._type = ValueType.SECTION_WITH_TEXTS
-        normalized_name = normalize_name(new_value.name)
+        self._display_order = None
+        normalized_name = new_value._name  # Already normalized in the constructor.
         if self._type.is_map():
+            if (replaced_value := self._children.get(normalized_name)) is not None:
+                replaced_value._remove_from_index()
             self._children[normalized_name] = new_value
         elif self._type == ValueType.VALUE_LIST or self._type == ValueType.SECTION_LIST:
+            if self._type == ValueType.SECTION_LIST and self._children:
+                # Names in a section list only resolve to the last entry.
+                self._children[-1]._remove_from_index(keep_indexed_paths=True)
             new_value._name = str(len(self._children))
-            new_value._path = new_value._create_path()
+            new_value._path = None
             self._children.append(new_value)
         else:
             raise InternalError(f"Cannot add value to `{self._type}`.")
+        new_value._add_to_index()
+
+    def _name_key(self) -> Optional[tuple[str, ...]]:
+        """
+        Get the name path used by `value_by_path`, or `None` if this value can't be addressed by name.
+
+        In this path, the entries of section lists are skipped, as names always resolve to the last entry.
+        """
+        parent = self._parent
+        if parent is None:
+            return ()
+        if parent._type == ValueType.VALUE_LIST or parent._type == ValueType.SECTION_LIST:
+            return None
+        grandparent = parent._parent
+        if grandparent is not None and grandparent._type == ValueType.SECTION_LIST:
+            parent = grandparent  # The parent is a section list entry.
+        parent_key = parent._name_key()
+        if parent_key is None:
+            return None
+        return parent_key + (self._name,)
+
+    def _add_to_index(self):
+        self._index[self._get_path()] = self
+        if (name_key := self._name_key()) is not None:
+            self._index[name_key] = self
+
+    def _remove_from_index(self, keep_indexed_paths: bool = False):
+        """Remove this value and all values below it from the index."""
+        for value in list(self.all_values()):
+            keys = [value._name_key()]
+            if not keep_indexed_paths:
+                keys.append(value._get_path())
+            for key in keys:
+                if key is not None and self._index.get(key) is value:
+                    del self._index[key]
+
+    def _attach(self, parent: "Value", name: str):
+        """Add this detached value to a parent, using an already normalized name."""
+        self._name = name
+        self._parent = parent
+        self._index = parent._index
+        parent._add_value(self)
+
+    def _copy_to(self, parent: "Value") -> "Value":
+        """Add a copy of this value and all values below it to the given parent, and return the copy."""
+        result = None
+        # Each entry is a value to copy and the parent for the copy.
+        stack: list[tuple["Value", "Value"]] = [(self, parent)]
+        while stack:
+            value, copy_parent = stack.pop()
+            copy = Value("", value._type, None, value.data)
+            copy._attach(copy_parent, value._name)
+            if result is None:
+                result = copy
+            if value._children:
+                stack.extend((child, copy) for child in reversed(list(value.iter_children())))
+        return result
 
     @property
     def name(self) -> str:
@@ -269,6 +461,8 @@ class Value:
 
     @property
     def data(self) -> Any:
+        if self._type is ValueType.FLOAT and type(self._data) is str:
+            self._data = float(self._data)  # Floats keep their validated literal, until the data is read.
         return self._data
 
     @data.setter
@@ -277,14 +471,26 @@ class Value:
 
     @property
     def path(self) -> list[str]:
-        return self._path.copy()
+        return list(self._get_path())
 
     @property
     def children(self) -> Union[dict[str, "Value"], list["Value"], None]:
+        """A copy of the children. Use `iter_children` or `child_count` to access the children without a copy."""
         if self._children is None:
             return None
         return self._children.copy()
 
+    @property
+    def child_count(self) -> int:
+        """The number of children."""
+        return len(self._children) if self._children is not None else 0
+
+    def iter_children(self) -> Iterator["Value"]:
+        """Iterate over the children, without a copy."""
+        if isinstance(self._children, dict):
+            return iter(self._children.values())
+        return iter(self._children or ())
+
     def is_root(self) -> bool:
         return self._parent is None
 
@@ -330,30 +536,37 @@ class Value:
             return False
         return any(not value.is_section() for value in self._children.values())
 
-    def children_sorted_for_display(self) -> list["Value"]:
-        """Get a list of children sorted for display."""
-        result = []
-        if isinstance(self._children, list):
-            result = self._children
-        elif isinstance(self._children, dict):
-            result = list(self._children.values())
-        if not result:
-            return []
+    def children_sorted_for_display(self) -> tuple["Value", ...]:
+        """
+        Get the children sorted for display.
+
+        The order is cached until the next child is added, so the returned tuple is shared between calls.
+        """
+        if self._display_order is None:
 
-        def sort_key(value: "Value"):  # Sort sections before values, then a-z
-            if value.is_section():
-                return f"a{value.name}"
-            return f"b{value.name}"
+            def sort_key(value: "Value"):  # Sort sections before values, then a-z
+                return not value.is_section(), value.name
 
-        return list(sorted(result, key=sort_key))
+            self._display_order = tuple(sorted(self.iter_children(), key=sort_key))
+        return self._display_order
 
     @property
     def has_text_name(self) -> bool:
         return self._name.startswith('"')
 
     def value_by_path(self, name_path: list[str]) -> Optional["Value"]:
+        """
+        Lookup a value by its name path.
+        Like for `value`, if the path contains a list of maps, the last map in the list is used.
+        """
         if not isinstance(name_path, list) or len(name_path) == 0:
             return None
+        if self._parent is None:
+            # Regular names are normalized, text names are compared as they are, like in `value`.
+            key = tuple(name if name.startswith('"') else normalize_name(name) for name in name_path)
+            value = self._index.get(key)
+            # The index also contains the paths with indexes of section lists, these aren't names.
+            return value if value is not None and value._name_key() == key else None
         v = self.value(name_path[0])
         if v is None or len(name_path) == 1:
             return v
@@ -379,6 +592,37 @@ class Value:
                 return self._children[-1].value(name)
         return None
 
+    def value_by_name_path(self, name_path: str) -> Optional["Value"]:
+        """
+        Lookup a value by a name path in text form, like `server.filter[1].port` or `book."Some Title".isbn`.
+
+        Names without index resolve to the last entry of a section list, an index `[n]` selects the entry, or the
+        element of a value list explicitly.
+        """
+        elements = []
+        for match in self.RE_NAME_PATH_ELEMENT.finditer(name_path):
+            if match.group(1) is not None:
+                elements.append(str(int(match.group(1))))
+            elif match.group(0).startswith('"'):
+                elements.append(normalize_name(match.group(0)))
+            else:
+                elements.append(normalize_name(match.group(0).strip()))
+        if not elements:
+            return None
+        if self._parent is None and (value := self._index.get(tuple(elements))) is not None:
+            return value
+        # Paths that mix indexes with names in section lists are resolved step by step.
+        value = self
+        for element in elements:
+            if isinstance(value._children, list) and element.isdigit():
+                index = int(element)
+                value = value._children[index] if index < len(value._children) else None
+            else:
+                value = value.value(element)
+            if value is None:
+                return None
+        return value
+
     def create_missing_maps(self, name_path: list[str]) -> "Value":
         """Create all missing paths in `name_path` and return the last element."""
         if not isinstance(name_path, list):
@@ -395,16 +639,69 @@ class Value:
             return v
         return v.create_missing_maps(name_path[1:])
 
-    def all_values(self):
-        """Return all values as a flat list"""
-        if self._path:
-            yield self
-        if isinstance(self._children, list):
-            for child in self._children:
-                yield from child.all_values()
-        elif isinstance(self._children, dict):
-            for child in self._children.values():
-                yield from child.all_values()
+    def all_values(
+        self,
+        order: "TraversalOrder" = "pre",
+        *,
+        max_depth: Optional[int] = None,
+        value_types: Optional[set[ValueType]] = None,
+        include_sections: bool = True,
+        include_values: bool = True,
+        path_prefix: Optional[list[str]] = None,
+    ) -> Iterator["Value"]:
+        """
+        Iterate over this value and all values below it. The unnamed document root is skipped.
+
+        The tree is traversed with an explicit stack, so the depth of the tree is not limited by the recursion limit.
+
+        :param order: `TraversalOrder.PRE` (default) yields a value before its children, `TraversalOrder.POST` after.
+        :param max_depth: If set, only values up to this depth are visited. The children of this value have depth 1.
+        :param value_types: If set, only yield values with one of these types.
+        :param include_sections: If sections, including section lists, are yielded.
+        :param include_values: If all other values are yielded.
+        :param path_prefix: If set, only yield the value with this path and the values below it. The path is
+            a normalized path, as returned by `path`.
+        """
+        start, start_depth = self, 0
+        if path_prefix:
+            start = self._index.get(tuple(path_prefix))
+            own_path = self._get_path()
+            if start is None or start._get_path()[: len(own_path)] != own_path:
+                return
+            start_depth = len(start._get_path()) - len(own_path)
+            if max_depth is not None and start_depth > max_depth:
+                return
+        is_post_order = order == TraversalOrder.POST
+
+        def is_selected(value: "Value") -> bool:
+            if value._parent is None and not value._name:  # Skip the unnamed document root.
+                return False
+            if not (include_sections if value.is_section() else include_values):
+                return False
+            return value_types is None or value._type in value_types
+
+        # Each entry is a value, its depth, and if its children were already visited.
+        stack: list[tuple["Value", int, bool]] = [(start, start_depth, False)]
+        while stack:
+            value, depth, is_visited = stack.pop()
+            if is_visited:
+                yield value
+                continue
+            if is_selected(value):
+                if is_post_order:
+                    stack.append((value, depth, True))
+                else:
+                    yield value
+            if value._children and (max_depth is None or depth < max_depth):
+                children = value._children.values() if isinstance(value._children, dict) else value._children
+                stack.extend((child, depth + 1, False) for child in reversed(children))
+
+
+class TraversalOrder(enum.StrEnum):
+    """The order in which `Value.all_values` yields the values."""
+
+    PRE = "pre"  # A value before its children.
+    POST = "post"  # A value after its children.
 
 
 class SectionType(enum.Enum):
@@ -439,6 +736,195 @@ RE_END_OF_LINE = r"""(?x)
     ( \n | \r\n )                            # Line break.
 """
 RE_SPACING = r"[ \t]+"
+RE_SECTION_ERROR = r"""(?x)
+    -* \*? \[ (?:                      # Section start
+        (?: [ \t] | \. )*              #   Error: No actual content
+    |
+        [ \t]* " [^\]]+?               #   Error: Starts with text value.
+    ) \] \*? -*                        # Section end
+"""
+RE_SECTION_START = r"(-*\*?)(\[)([ \t]*)(\.)?"
+RE_VALUE_NAME_START = r"(?i)(?=@?[a-z\"])"
+RE_CONTROL_CHARACTERS = r"[\x00-\x08\x0A-\x1F\x7F-\x9F]+"
+RE_SECTION_NAME_PART = r"""(?xi)
+    (                                             # (1)
+        [a-z][a-z0-9]*(?:[ _][a-z0-9]+)*          # Name
+    |                                             # or
+        " (?: \\                                  # Text start with double quote
+            (?: [\\"$nrt] | u (?:                 #   Handle an escape sequence
+                [a-fA-F0-9]{4} |
+                \{ [a-fA-F0-9]{1,8} \}
+            ) )
+        |
+            [^\x00-\x08\x0A-\x1F\x7F-\x9F\\"]++  #   Or any non-reserved, non-control character
+        )*+ "                                     # Text end with double quote (possessive, no backtracking)
+    )
+    ( [ \t]* )                                    # (2) Optional spacing
+    (?: (\]) | (\.) )                             # (3)(4) Name separator or section end
+    (?(3)                                         # If section end ...
+        (\*? -*)                                  # (5) Match optional star and dash
+        |                                         # ... else ...
+        ([ \t]*)                                  # (6) Optional whitespace
+    )
+"""
+RE_VALUE_NAME = r"""(?xi)
+    (?:                                            # (1)
+        @?[a-z][a-z0-9]*(?:[ _][a-z0-9]+)*         # Name or Meta Name
+    |                                              # or
+        " (?: \\                                   # Text start with double quote
+            (?: [\\"$nrt] | u (?:                  #   Handle an escape sequence
+                [a-fA-F0-9]{4} |
+                \{ [a-fA-F0-9]{1,8} \}
+            ) )
+        |
+            [^\x00-\x08\x0A-\x1F\x7F-\x9F\\"]++    #   Or any non-reserved, non-control character
+        )*+ "                                      # Text end with double quote (possessive, no backtracking)
+    )
+"""
+RE_TRAILING_COMMA = r"""(?x)
+    ( [ \t]* )                               # Optional spacing.
+    ( , )                                    # Trailing comma.
+    ( [ \t]* )                               # Optional spacing.
+    ( \# [^\x00-\x08\x0A-\x1F\x7F-\x9F]* )?  # Optional comment.
+    ( \n | \r\n )                            # Line break.
+"""
+RE_COMMA = r"""(?x)
+    ( [ \t]* )
+    ( , )
+    ( [ \t]* )
+"""
+RE_BOOLEAN = r"(?i)(true|false|yes|no|enabled|disabled|on|off)"
+RE_HEX_INTEGER = r"""(?xi)
+    [-+]?                                    # Positive or negative sign
+    0x                                       # Hex prefix
+    (?: [a-f0-9]+ \u0027 )* [a-f0-9]+        # Hex digits groups, optional '
+"""
+RE_BIN_INTEGER = r"""(?xi)
+    [-+]?                                    # Positive or negative sign
+    0b                                       # Binary prefix
+    (?: [01]+ \u0027 )* [01]+                # Binary digits groups, optional '
+"""
+RE_DEC_INTEGER = r"""(?xi)
+    [-+]?                                    # Positive or negative sign
+    (?: \d+ \u0027 )* \d+                    # Integer digits groups, optional '
+"""
+RE_FLOAT_LITERAL = r"""(?xi)
+    [-+]?
+    (?: inf | nan )
+"""
+RE_FLOAT = r"""(?xi)
+    [-+]?                                      # Positive or negative sign.
+    (?:
+        (?:                                    # [X].Y[E+Z] notation.
+            (?: (?: \d+ \u0027 )* \d+ )? \. (?: \d+ \u0027 )* \d+
+        |                                      # X.[Y][E+Z] notation.
+            (?: \d+ \u0027 )* \d+ \. (?: (?: \d+ \u0027 )* \d+ )?
+        )
+        (?:
+            e[-+]? \d+
+        )?
+    |                                          # XE+Z notation.
+        (?: \d+ \u0027 )* \d+
+        e[-+]? \d+
+    )
+"""
+RE_DATE_TIME = r"""(?ix)
+    (
+        \d{4} - (?: 0[1-9] | 1[0-2] ) - (?: 0[1-9] | [12]\d | 3[01] )
+        [ t]?
+        (?: [01]\d | 2[0-3] ) : ( [0-5]\d )
+        (?: : [0-5]\d (?: \. \d{1,9} )? )?
+        (?: z | [-+] (?: [01]\d | 2[0-3] ) (?: : [0-5]\d )? )?
+    |
+        \d{4} - (?: 0[1-9] | 1[0-2] ) - (?: 0[1-9] | [12]\d | 3[01] )
+    |
+        t?
+        (?: [01]\d | 2[0-3] ) : (?: [0-5]\d )
+        (?: : [0-5]\d (?: \. \d{1,9} )? )?
+        (?: z | [-+] (?: [01]\d | 2[0-3] ) (?: : [0-5]\d )? )?
+    )
+"""
+RE_BYTE_COUNT = r"""(?ix)
+    (
+        [-+]?                                # Positive or negative sign
+        (?: \d+ \u0027 )* \d+                # Integer digits with optional '
+    )
+    ( \x20 )?                                # Optional space between digits and unit
+    ( [kmgtpezy] i? b )                      # Iso unit up to yota-bytes
+"""
+RE_TIME_DELTA = r"""(?ix)
+    (
+        [-+]?                                # Positive or negative sign
+        (?: \d+ \u0027 )* \d+                # Integer digits with optional '
+    )
+    ( \x20 )?                                # Optional space before the unit.
+    (
+        nanoseconds? | ns |
+        microseconds? | us | µs |
+        milliseconds? | ms |
+        seconds? | s |
+        minutes? | m |
+        hours? | h |
+        days? | d |
+        weeks? | w |
+        months? |
+        years?
+    )
+"""
+RE_TEXT_CHARACTERS = r'[^\x00-\x08\x0A-\x1F\x7F-\x9F\\"$]+'
+RE_TEXT_ESCAPE_SEQUENCE = r'(?ix) \\ ( [\\"$nrt] | u (?: [a-f0-9]{4} | \{ [a-f0-9]{1,8} \} ) )'
+RE_PLACEHOLDER_DOLLAR = r"(?ix) \$ (?!\{)"
+RE_PLACEHOLDER_EMPTY = r"(?ix) \$ \{ \}"
+RE_PLACEHOLDER = r"(?ix) \$ \{ [-=.: _a-z0-9]+ \}"
+RE_PLACEHOLDER_OPEN = r"(?ix) \$ \{ [-=.: _a-z0-9]*"
+RE_MULTI_LINE_EMPTY_FIRST_LINE = RE_END_OF_LINE + r"(?=[ \t]*\n|\r\n)"
+RE_MULTI_LINE_FIRST_LINE = RE_END_OF_LINE + r"([ \t]+)"
+RE_MULTI_LINE_LINE_BREAK = r"(\n|\r\n)([ \t]+)"
+RE_MULTI_LINE_EMPTY_LINE = r"(\n|\r\n)(?=\n|\r\n)"
+RE_MULTI_LINE_SPACING = r"([ \t]+)(\n|\r\n)?"
+RE_MULTI_LINE_TEXT_CHARACTERS = r"[^\x00-\x08\x0A-\x1F\x7F-\x9F\\$ \t]+"
+RE_CODE_CHARACTERS = r"[^\x00-\x08\x0A-\x1F\x7F-\x9F`]+"
+RE_MULTI_LINE_CODE_START = r"(```)(\w{1,16})?"
+RE_MULTI_LINE_CODE_CHARACTERS = r"[^\x00-\x08\x0A-\x1F\x7F-\x9F]+"
+RE_MULTI_LINE_REGEX_START = r"(///)([ \t]*)"
+RE_REGEX_ESCAPE = r"""(?x)
+    \\ (
+        x[a-fA-F0-9]{2} |
+        u[a-fA-F0-9]{4} |
+        U[a-fA-F0-9]{8} |
+        N\{ [^}]*? \} |
+        [^\x00-\x08\x0A-\x1F\x7F-\x9F]
+    )
+"""
+RE_REGEX_COMMENT = r"""(?x)
+    ( \# [^\x00-\x08\x0A-\x1F\x7F-\x9F]* )
+    (?= \n | \r\n )
+"""
+RE_REGEX_OPERATOR = r"[-.^$*+?]"
+RE_REGEX_PUNCTUATION = r"[\x28\x29\x5B\x5D\x7B-\x7D]"
+RE_REGEX_CHARACTERS = r"[^\x00-\x08\x0A-\x1F\x7F-\x9F\\/\x28\x29\x2d\x5B\x5D\x7B-\x7D.^$*+?#]+"
+RE_BYTE_DATA_START = r"(<)(hex:)?"
+RE_BYTE_DATA_BYTE = r"[a-fA-F0-9]{2}"
+RE_BYTE_DATA_BYTES = r"[a-fA-F0-9]{2}(?:[ \t]*[a-fA-F0-9]{2})*"
+RE_MULTI_LINE_BYTE_DATA_START = r"(<<<)(hex)?"
+
+
+FIRST_LETTERS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+FIRST_DIGITS = "0123456789"
+FIRST_END_OF_LINE = " \t#\n\r"
+FIRST_CONTROL_CHARACTERS = "".join(chr(c) for c in [*range(0x00, 0x09), *range(0x0A, 0x20), *range(0x7F, 0xA0)])
+
+
+def _first_char_table(
+    rules: list[tuple[str, str, Callable, tuple[str, ...]]], flags: int
+) -> dict[str, list[tuple[Callable, Callable, tuple[str, ...]]]]:
+    """Map each first character to the compiled rules that can start with it, keeping the order of the rules."""
+    table: dict[str, list[tuple[Callable, Callable, tuple[str, ...]]]] = {}
+    for first_chars, regex, action, new_states in rules:
+        rule = (re.compile(regex, flags).match, action, new_states)
+        for c in first_chars:
+            table.setdefault(c, []).append(rule)
+    return table
 
 
 class ErbslandConfigurationLanguage(ExtendedRegexLexer):
@@ -480,11 +966,14 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         "eib": 2**60,
     }
 
+    INTEGER_TOKENS = {"dec": Number.Integer, "hex": Number.Hex, "bin": Number.Bin}
+
     def __init__(
         self,
         error_tracing_enabled=False,
         accept_all_signatures=True,
         error_tracing_callback: Callable[[int, Any, str, EclContext], None] = None,
+        include_resolver: Optional["IncludeResolver"] = None,
         **options,
     ):
         """
@@ -492,30 +981,121 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         :param error_tracing_enabled: Raise an exception on errors if enabled.
         :param accept_all_signatures: Accept all signatures (for syntax highlighting).
         :param error_tracing_callback: A callback, called for each token,
+        :param include_resolver: Resolve `@include` commands in value trees with this resolver, if set.
         """
         super().__init__(**options)
         self.error_tracing_enabled = error_tracing_enabled
         self.error_tracing_callback = error_tracing_callback
         self.accept_all_signatures = accept_all_signatures
-        self.last_root: Optional[Value] = None
+        self.include_resolver = include_resolver
 
     def get_value_tree(self, text: str) -> Value:
         """
         Try to parse the given text and return the root of the value tree.
 
+        The tree is built by the `ValueTreeParser`, which runs the same checks as this lexer, but never
+        creates any tokens.
+
         :raises: DocumentError if there was any error during parsing.
         """
         try:
-            for pos, token_type, token_text in self.get_tokens_unprocessed(text):
-                if token_type is Error:
-                    raise DocumentError(pos, token_text, "Failed to parse document.")
-            self.last_root.type = ValueType.DOCUMENT
-            return self.last_root
+            return ValueTreeParser(self).parse(text)
         except InternalError as error:
             raise DocumentError(0, "", str(error))
 
+    def get_value_tree_from_file(self, path: Path, chunk_size: int = 0x100000) -> Value:
+        """
+        Parse the given UTF-8 document file and return the root of the value tree.
+
+        The file is decoded incrementally and parsed in chunks of lines, so large documents are never
+        loaded into memory as a whole.
+
+        :param path: The path to the document.
+        :param chunk_size: The number of characters to read at once.
+        :raises: DocumentError if there was any error during parsing.
+        """
+        with path.open(encoding="utf-8") as file:
+            try:
+                return ValueTreeParser(self, path).parse_chunks(iter(functools.partial(file.read, chunk_size), ""))
+            except InternalError as error:
+                raise DocumentError(0, "", str(error))
+
+    def validate(self, text: str) -> Optional[DocumentError]:
+        """
+        Check the given text and return the first error, or `None` if the document is valid.
+
+        Parsing stops at the first error, and the value tree is discarded. Unlike the errors of `get_value_tree`,
+        the returned error always has a detailed message, the line and the column.
+        """
+        return self._validate(ValueTreeParser(self), lambda parser: parser.parse(text))
+
+    def validate_file(self, path: Path, chunk_size: int = 0x100000) -> Optional[DocumentError]:
+        """
+        Check the given UTF-8 document file and return the first error, or `None` if the document is valid.
+
+        :param path: The path to the document.
+        :param chunk_size: The number of characters to read at once.
+        :raises: OSError or UnicodeDecodeError if the file can't be read.
+        """
+        with path.open(encoding="utf-8") as file:
+            chunks = iter(functools.partial(file.read, chunk_size), "")
+            return self._validate(ValueTreeParser(self, path), lambda parser: parser.parse_chunks(chunks))
+
+    @staticmethod
+    def _validate(parser: "ValueTreeParser", parse: Callable[["ValueTreeParser"], Value]) -> Optional[DocumentError]:
+        parser.is_validating = True
+        try:
+            parse(parser)
+        except DocumentError as error:
+            return error
+        except InternalError as error:
+            return DocumentError(0, "", str(error))
+        return None
+
+    def get_diagnostics(self, text: str) -> list[Diagnostic]:
+        """
+        Check the given text and return all errors found in one pass.
+
+        After each error, the parser skips to the next line that starts a new value, or to the next section if the
+        error was in a section name. Errors that follow from an earlier error may still be reported.
+        """
+        parser = ValueTreeParser(self)
+        return self._collect_diagnostics(parser, lambda: parser.parse(text))
+
+    def get_diagnostics_from_file(self, path: Path, chunk_size: int = 0x100000) -> list[Diagnostic]:
+        """
+        Check the given UTF-8 document file and return all errors found in one pass.
+
+        :param path: The path to the document.
+        :param chunk_size: The number of characters to read at once.
+        :raises: OSError or UnicodeDecodeError if the file can't be read.
+        """
+        parser = ValueTreeParser(self, path)
+        with path.open(encoding="utf-8") as file:
+            chunks = iter(functools.partial(file.read, chunk_size), "")
+            return self._collect_diagnostics(parser, lambda: parser.parse_chunks(chunks))
+
+    @staticmethod
+    def _collect_diagnostics(parser: "ValueTreeParser", parse: Callable[[], Value]) -> list[Diagnostic]:
+        parser.is_validating = True
+        parser.diagnostics = []
+        try:
+            parse()
+        except DocumentError as error:
+            parser.add_diagnostic(error, error.pos)  # An error at the end of the document.
+        except InternalError as error:
+            parser.add_diagnostic(DocumentError(0, "", str(error)), 0)
+        return parser.diagnostics
+
     def get_tokens_unprocessed(self, text=None, context=None):
-        context = EclContext(text, 0)
+        """
+        Yield the tokens for the given text.
+
+        All state of a run is kept in the context, so one lexer can be used by many threads at once. Pass your own
+        `EclContext` to access the value tree, that was built from the tokens.
+        """
+        if context is None:
+            context = EclContext(text, 0)
         for token in super().get_tokens_unprocessed(text, context):
             if self.error_tracing_callback:
                 pos, token_type, text = token
@@ -526,7 +1106,6 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
                 yield context.pos, Error, f"Name or text with no value at end of document."
             else:
                 yield context.pos, Error, f'Unmatched open "{context.open_states[-1]}"'
-        self.last_root = context.root
 
     def yield_groups(self, match: re.Match, tokens: list[Token]):
         group_count = len(match.groups())
@@ -548,16 +1127,8 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         ctx.value = None
 
     def section_start(self, match: re.Match, ctx: EclContext):
-        self.section_reset(ctx)
-        ctx.section_type = SectionType.LIST if ("*" in match.group(1)) else SectionType.MAP
-        ctx.section_is_relative = match.group(4) == "."
         try:
-            # If a name has still no value at this point, raise an error
-            if ctx.open_states:
-                raise InternalError("There is something missing from previous lines.")
-            # A document must not start with a relative section.
-            if ctx.section_is_relative and ctx.absolute_section is None:
-                raise InternalError("A document must not start with a relative section.")
+            self._parse_section_start(match, ctx)
             yield from self.yield_groups(match, [Operator, Punctuation, Whitespace, Operator])
             ctx.pos = match.end()
         except InternalError as error:
@@ -565,11 +1136,34 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         finally:
             ctx.open_state(OpenState.SECTION)
 
+    def _parse_section_start(self, match: re.Match, ctx: EclContext):
+        self.section_reset(ctx)
+        ctx.section_type = SectionType.LIST if ("*" in match.group(1)) else SectionType.MAP
+        ctx.section_is_relative = match.group(4) == "."
+        # If a name has still no value at this point, raise an error
+        if ctx.open_states:
+            raise InternalError("There is something missing from previous lines.")
+        # A document must not start with a relative section.
+        if ctx.section_is_relative and ctx.absolute_section is None:
+            raise InternalError("A document must not start with a relative section.")
+
     def section_error(self, match: re.Match, ctx: EclContext):
         self.section_reset(ctx)
         yield from handle_error(self, match, ctx)
 
     def section_name_part(self, match: re.Match, ctx: EclContext):
+        is_section_end = bool(match.group(3))  # Section header end indicator
+        is_text = match.group(1).startswith('"')
+        self._parse_section_name_part(match, ctx)
+        yield from self._yield_result(match, ctx, is_text)
+        if is_section_end:
+            ctx.close_state()
+            ctx.section_error_message = ""
+            ctx.stack.pop()
+        ctx.pos = match.end()
+
+    def _parse_section_name_part(self, match: re.Match, ctx: EclContext):
+        """Add one name to the section name path, and store any error in `ctx.section_error_message`."""
         name = match.group(1)
         after_section_end = match.group(5)
         is_continued = bool(match.group(4))  # Relative section indicator
@@ -588,12 +1182,6 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
             if not ctx.section_error_message:
                 ctx.section_error_message = str(error)
                 ctx.section = Value(f"#error", ValueType.SECTION_WITH_NAMES, ctx.root)
-        yield from self._yield_result(match, ctx, is_text)
-        if is_section_end:
-            ctx.close_state()
-            ctx.section_error_message = ""
-            ctx.stack.pop()
-        ctx.pos = match.end()
 
     def _validate_name(self, ctx: EclContext, name: str, is_text: bool, is_continued: bool):
         if ctx.section_is_relative and ctx.absolute_section is None:
@@ -719,47 +1307,55 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
 
     def process_value_name(self, match: re.Match, ctx: EclContext):
         try:
-            name = match.group(0)
-            if ctx.open_states:  # The previous name got no value yet?
-                error_state = ctx.open_states[-1]
-                ctx.close_state()
-                raise InternalError(f"The was no value after the last value separator. (open state={error_state})")
-            ctx.indent_pattern = None  # Reset the indent pattern.
-            ctx.open_state(OpenState.NAME)  # open until we get a value
-            name = normalize_name(name)
-            if name.startswith("@"):
-                name_type = NameType.META
-            elif name.startswith('"'):
-                name_type = NameType.TEXT
-                if name == '""':
-                    raise InternalError("An empty text name is not allowed.")
-            else:
-                name_type = NameType.REGULAR
-            section = ctx.section or ctx.root
-            if name_type != NameType.META and section is ctx.root:
-                raise InternalError("Values cannot be defined outside a section.")
-            v = section.value(name)
-            if v is not None:
-                display_name = name
-                if display_name.startswith('"'):
-                    display_name = name[1:-1]
-                raise InternalError(f'A {name_type} name "{display_name}" already exists in this section.')
-            if not section.is_empty():
-                if section.type == ValueType.SECTION_WITH_NAMES and name_type == NameType.TEXT:
-                    raise InternalError("Found a text name in a section that contains names.")
-                if section.type == ValueType.SECTION_WITH_TEXTS and name_type != NameType.TEXT:
-                    raise InternalError("Found a regular name in a section that contains text names.")
-            token = Name.Variable
-            if name_type == NameType.META:
-                token = self._process_meta_name(name, ctx)
-            # Everything is ok! add a new value to the section.
-            ctx.value = Value(name, ValueType.UNDEF, section)
+            token = self._parse_value_name(match.group(0), ctx)
             yield match.start(), token, match.group(0)
             ctx.pos = match.end()
         except InternalError:
             ctx.value = Value("???", ValueType.UNDEF)
             yield from handle_error(self, match, ctx)
 
+    def _parse_value_name(self, name: str, ctx: EclContext) -> Token:
+        """Add a new undefined value for `name` to the current section and return the token for the name."""
+        if ctx.open_states:  # The previous name got no value yet?
+            error_state = ctx.open_states[-1]
+            ctx.close_state()
+            raise InternalError(f"The was no value after the last value separator. (open state={error_state})")
+        ctx.indent_pattern = None  # Reset the indent pattern.
+        ctx.open_state(OpenState.NAME)  # open until we get a value
+        name = normalize_name(name)
+        if name.startswith("@"):
+            name_type = NameType.META
+        elif name.startswith('"'):
+            name_type = NameType.TEXT
+            if name == '""':
+                raise InternalError("An empty text name is not allowed.")
+        else:
+            name_type = NameType.REGULAR
+        if ctx.resolve_includes and name == "@include":
+            # The command is not part of the value tree. The parser resolves it, as soon as its text is complete.
+            ctx.value = ctx.pending_include = Value(name, ValueType.UNDEF)
+            return Name.Function
+        section = ctx.section or ctx.root
+        if name_type != NameType.META and section is ctx.root:
+            raise InternalError("Values cannot be defined outside a section.")
+        v = section.value(name)
+        if v is not None:
+            display_name = name
+            if display_name.startswith('"'):
+                display_name = name[1:-1]
+            raise InternalError(f'A {name_type} name "{display_name}" already exists in this section.')
+        if not section.is_empty():
+            if section.type == ValueType.SECTION_WITH_NAMES and name_type == NameType.TEXT:
+                raise InternalError("Found a text name in a section that contains names.")
+            if section.type == ValueType.SECTION_WITH_TEXTS and name_type != NameType.TEXT:
+                raise InternalError("Found a regular name in a section that contains text names.")
+        token = Name.Variable
+        if name_type == NameType.META:
+            token = self._process_meta_name(name, ctx)
+        # Everything is ok! add a new value to the section.
+        ctx.value = Value(name, ValueType.UNDEF, section)
+        return token
+
     def _process_meta_name(self, name: str, ctx: EclContext):
         token = Name.Builtin
         if name in self.META_BEGIN_UNIQUE:
@@ -797,44 +1393,44 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         ctx.pos = match.end()
 
     def _process_integer_value(self, match: re.Match, ctx: EclContext, format: str, max_digits: int):
+        try:
+            self._parse_integer_value(match, ctx, format, max_digits)
+            yield match.start(), self.INTEGER_TOKENS[format], match.group(0)
+            ctx.pos = match.end()
+        except InternalError as error:
+            yield from handle_error(self, match, ctx, str(error))
+
+    def _parse_integer_value(self, match: re.Match, ctx: EclContext, format: str, max_digits: int):
         self._value_processed(ctx)
         text = match.group(0).replace("'", "").lstrip("+")  # Remove digit separators and leading plus
         base = 10
-        token = Number.Integer
         if format == "hex":
             base = 16
-            token = Number.Hex
             text = text.lower().replace("0x", "")  # Remove prefix
         elif format == "bin":
             base = 2
-            token = Number.Bin
             text = text.lower().replace("0b", "")  # Remove prefix
+        if len(text.lstrip("-")) > max_digits:
+            raise InternalError("Too many digits for this number.")
         try:
-            if len(text.lstrip("-")) > max_digits:
-                raise InternalError("Too many digits for this number.")
-            try:
-                if format == "bin" and len(text) == max_digits and text[0] == "1":  # Binary negative sign
-                    value = int(text, base) - (1 << max_digits)  # Convert it into a negative number.
-                else:
-                    value = int(text, base)
-                if format == "dec" and value != 0 and text.startswith(("0", "-0")):
-                    raise InternalError("Zero prefix is not allowed")
-                if value >= 0 and value.bit_length() > 63:
-                    raise InternalError("The number exceeds the valid number range.")
-                if value < 0 and (abs(value) - 1).bit_length() > 63:
-                    raise InternalError("The negative number exceeds the valid number range.")
-            except ValueError as error:
-                raise InternalError(
-                    f"The number must be an integer. "
-                    f'Tried to parse "{text}" from original "{match.group(0)}". '
-                    f"Error: {error}"
-                )
-            ctx.value.type = ValueType.INTEGER
-            ctx.value.data = value
-            yield match.start(), token, match.group(0)
-            ctx.pos = match.end()
-        except InternalError as error:
-            yield from handle_error(self, match, ctx, str(error))
+            if format == "bin" and len(text) == max_digits and text[0] == "1":  # Binary negative sign
+                value = int(text, base) - (1 << max_digits)  # Convert it into a negative number.
+            else:
+                value = int(text, base)
+            if format == "dec" and value != 0 and text.startswith(("0", "-0")):
+                raise InternalError("Zero prefix is not allowed")
+            if value >= 0 and value.bit_length() > 63:
+                raise InternalError("The number exceeds the valid number range.")
+            if value < 0 and (abs(value) - 1).bit_length() > 63:
+                raise InternalError("The negative number exceeds the valid number range.")
+        except ValueError as error:
+            raise InternalError(
+                f"The number must be an integer. "
+                f'Tried to parse "{text}" from original "{match.group(0)}". '
+                f"Error: {error}"
+            )
+        ctx.value.type = ValueType.INTEGER
+        ctx.value.data = value
 
     def process_dec_value(self, match: re.Match, ctx: EclContext):
         yield from self._process_integer_value(match, ctx, "dec", 19)
@@ -846,44 +1442,55 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         yield from self._process_integer_value(match, ctx, "bin", 64)
 
     def process_float_value(self, match: re.Match, ctx: EclContext):
-        self._value_processed(ctx)
-        # Remove digit separators and leading plus
-        text = match.group(0).replace("'", "").lstrip("+").lower()
         try:
-            try:
-                mantissa_part = slice(0, text.index("e")) if "e" in text else slice(0, len(text))
-                if sum(1 for c in text[mantissa_part] if c.isdigit()) > 20:
-                    raise InternalError("Too many digits for this number.")
-                if "e" in text and len(text[text.index("e") :].strip("e+-")) > 6:
-                    raise InternalError("Too many digits in the exponent.")
-                value = float(text)
-                if "." in text:
-                    int_text = text[: text.index(".")]
-                elif "e" in text:
-                    int_text = text[: text.index("e")]
-                else:
-                    int_text = text
-                int_text = int_text.lstrip("-")
-                if len(int_text) > 1 and int_text.startswith("0"):
-                    raise InternalError("Zero prefix is not allowed")
-            except ValueError:
-                raise InternalError("This is no valid floating point number.")
-            ctx.value.type = ValueType.FLOAT
-            ctx.value.data = value
+            self._parse_float_value(match, ctx)
             yield match.start(), Number.Float, match.group(0)
             ctx.pos = match.end()
         except InternalError:
             yield from handle_error(self, match, ctx)
 
+    def _parse_float_value(self, match: re.Match, ctx: EclContext):
+        self._value_processed(ctx)
+        # Remove digit separators and leading plus
+        text = match.group(0).replace("'", "").lstrip("+").lower()
+        mantissa_part = slice(0, text.index("e")) if "e" in text else slice(0, len(text))
+        if sum(1 for c in text[mantissa_part] if c.isdigit()) > 20:
+            raise InternalError("Too many digits for this number.")
+        if "e" in text and len(text[text.index("e") :].strip("e+-")) > 6:
+            raise InternalError("Too many digits in the exponent.")
+        if "." in text:
+            int_text = text[: text.index(".")]
+        elif "e" in text:
+            int_text = text[: text.index("e")]
+        else:
+            int_text = text
+        int_text = int_text.lstrip("-")
+        if len(int_text) > 1 and int_text.startswith("0"):
+            raise InternalError("Zero prefix is not allowed")
+        ctx.value.type = ValueType.FLOAT
+        # The syntax is fully validated above, so only the short literal is kept, and converted when it is read.
+        ctx.value.data = text
+
     def process_bool_value(self, match: re.Match, ctx: EclContext):
+        self._parse_bool_value(match, ctx)
+        yield match.start(), Keyword.Constant, match.group(0)
+        ctx.pos = match.end()
+
+    def _parse_bool_value(self, match: re.Match, ctx: EclContext):
         self._value_processed(ctx)
         data = match.group(0).lower() in ["true", "yes", "enabled", "on"]
         ctx.value.type = ValueType.BOOLEAN
         ctx.value.data = data
-        yield match.start(), Keyword.Constant, match.group(0)
-        ctx.pos = match.end()
 
     def process_date_value(self, match: re.Match, ctx: EclContext):
+        try:
+            self._parse_date_value(match, ctx)
+            yield match.start(), Literal.Date, match.group(0)
+            ctx.pos = match.end()
+        except InternalError as error:
+            yield from handle_error(self, match, ctx, str(error))
+
+    def _parse_date_value(self, match: re.Match, ctx: EclContext):
         self._value_processed(ctx)
         dt_text = str(match.group(0).upper())  # Upper for python time parsing.
         try:
@@ -899,10 +1506,8 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
             else:
                 ctx.value.data = datetime.date.fromisoformat(dt_text)
                 ctx.value.type = ValueType.DATE
-            yield match.start(), Literal.Date, match.group(0)
-            ctx.pos = match.end()
         except ValueError as error:
-            yield from handle_error(self, match, ctx, f"The date/time value is not valid. Error: {error}")
+            raise InternalError(f"The date/time value is not valid. Error: {error}")
 
     def _get_token_for_state(self, state: OpenState):
         match state:
@@ -925,11 +1530,7 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         return String
 
     def _process_generic_text_start(self, match: re.Match, ctx: EclContext, state: OpenState, value_type: ValueType):
-        self._value_processed(ctx)
-        ctx.open_state(state)
-        if ctx.value:
-            ctx.value_text = ""
-            ctx.value.type = value_type
+        self._parse_text_start(ctx, state, value_type)
         token = self._get_token_for_state(ctx.open_states[-1])
         if state == OpenState.MULTILINE_CODE:
             yield from self.yield_groups(match, [token, String.Affix])
@@ -937,6 +1538,13 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
             yield match.start(), token, match.group(0)
         ctx.pos = match.end()
 
+    def _parse_text_start(self, ctx: EclContext, state: OpenState, value_type: ValueType):
+        self._value_processed(ctx)
+        ctx.open_state(state)
+        if ctx.value:
+            ctx.value_text_parts = []
+            ctx.value.type = value_type
+
     def process_text_start(self, match: re.Match, ctx: EclContext):
         yield from self._process_generic_text_start(match, ctx, OpenState.TEXT, ValueType.TEXT)
 
@@ -947,50 +1555,58 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         yield from self._process_generic_text_start(match, ctx, OpenState.REGEX, ValueType.REGEX)
 
     def process_text_char(self, match: re.Match, ctx: EclContext):
-        ctx.value_text += match.group(0)
+        ctx.value_text_parts.append(match.group(0))
         yield match.start(), String.Double, match.group(0)
         ctx.pos = match.end()
 
     def process_text_escape(self, match: re.Match, ctx: EclContext):
-        escape_text = match.group(1).lower()
         try:
-            if escape_text in TEXT_ESCAPE_SUBSTITUTIONS:
-                ctx.value_text += TEXT_ESCAPE_SUBSTITUTIONS[escape_text]
-            elif escape_text.startswith("u"):
-                try:
-                    if escape_text[1] == "{":
-                        code = int(escape_text[2:-1], 16)
-                    else:
-                        code = int(escape_text[1:], 16)
-                except ValueError:
-                    yield from handle_error(self, match, ctx)
-                    return
-                if code <= 0 or (0xD800 <= code <= 0xDFFF) or code > 0x10FFFF:
-                    raise InternalError(f"Invalid unicode escape code point 0x{code:x}.")
-                ctx.value_text += chr(code)
-            else:
-                raise InternalError(f"Unknown escape sequence {escape_text}")
+            self._parse_text_escape(match, ctx)
             yield match.start(), String.Escape, match.group(0)
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_text_escape(self, match: re.Match, ctx: EclContext):
+        escape_text = match.group(1).lower()
+        if escape_text in TEXT_ESCAPE_SUBSTITUTIONS:
+            ctx.value_text_parts.append(TEXT_ESCAPE_SUBSTITUTIONS[escape_text])
+        elif escape_text.startswith("u"):
+            try:
+                if escape_text[1] == "{":
+                    code = int(escape_text[2:-1], 16)
+                else:
+                    code = int(escape_text[1:], 16)
+            except ValueError:
+                raise InternalError("")
+            if code <= 0 or (0xD800 <= code <= 0xDFFF) or code > 0x10FFFF:
+                raise InternalError(f"Invalid unicode escape code point 0x{code:x}.")
+            ctx.value_text_parts.append(chr(code))
+        else:
+            raise InternalError(f"Unknown escape sequence {escape_text}")
+
     def process_text_end(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Unexpected text end, with no value prepared.")
-            ctx.value.data = ctx.value_text
-            # If we just read a meta 'version' value with a version != 1.0, rise an error.
-            if ctx.value.type == ValueType.TEXT and ctx.value.name == "@version" and ctx.value_text != "1.0":
-                raise InternalError("Unsupported language version number.")
+            self._parse_text_end(ctx)
             yield match.start(), self._get_token_for_state(ctx.open_states[-1]), match.group(0)
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
         finally:
-            ctx.value_text = ""
-            ctx.indent_pattern = None
-            ctx.close_state()
+            self._close_text(ctx)
+
+    def _parse_text_end(self, ctx: EclContext):
+        if not ctx.value:
+            raise InternalError("Unexpected text end, with no value prepared.")
+        ctx.value.data = ctx.value_text
+        # If we just read a meta 'version' value with a version != 1.0, rise an error.
+        if ctx.value.type == ValueType.TEXT and ctx.value.name == "@version" and ctx.value.data != "1.0":
+            raise InternalError("Unsupported language version number.")
+
+    def _close_text(self, ctx: EclContext):
+        ctx.value_text_parts = []
+        ctx.indent_pattern = None
+        ctx.close_state()
 
     def process_multi_line_text_start(self, match: re.Match, ctx: EclContext):
         yield from self._process_generic_text_start(match, ctx, OpenState.MULTILINE_TEXT, ValueType.TEXT)
@@ -1003,12 +1619,7 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
 
     def process_after_multi_line_start(self, match: re.Match, ctx: EclContext):
         try:
-            indentation = match.group(4)
-            if not ctx.indent_pattern:
-                # Store the initial indent pattern, if this wasn't already done before.
-                ctx.indent_pattern = indentation
-            elif not indentation.startswith(ctx.indent_pattern):
-                raise InternalError("Indentation pattern after opening sequence does not match.")
+            self._parse_after_multi_line_start(match, ctx)
             if match.group(1):
                 yield match.start(1), Whitespace, match.group(1)
             if match.group(2):
@@ -1020,66 +1631,72 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_after_multi_line_start(self, match: re.Match, ctx: EclContext):
+        indentation = match.group(4)
+        if not ctx.indent_pattern:
+            # Store the initial indent pattern, if this wasn't already done before.
+            ctx.indent_pattern = indentation
+        elif not indentation.startswith(ctx.indent_pattern):
+            raise InternalError("Indentation pattern after opening sequence does not match.")
+
     def process_multi_line_text(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Multi-line text in the wrong state")
-            ctx.value_text += match.group(0)
+            self._parse_multi_line_text(match, ctx)
             yield match.start(), self._get_token_for_state(ctx.open_states[-1]), match.group(0)
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_multi_line_text(self, match: re.Match, ctx: EclContext):
+        if not ctx.value:
+            raise InternalError("Multi-line text in the wrong state")
+        ctx.value_text_parts.append(match.group(0))
+
     def process_multi_line_spacing(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Multi-line spacing in the wrong state")
-            if not match.group(2):  # Do not add trailing spacing.
-                ctx.value_text += match.group(1)
+            self._parse_multi_line_spacing(match, ctx)
             yield match.start(), self._get_token_for_state(ctx.open_states[-1]), match.group(0)
             ctx.pos = match.end(1)
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_multi_line_spacing(self, match: re.Match, ctx: EclContext):
+        if not ctx.value:
+            raise InternalError("Multi-line spacing in the wrong state")
+        if not match.group(2):  # Do not add trailing spacing.
+            ctx.value_text_parts.append(match.group(1))
+
     def process_multi_line_line_break(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Multi-line line-break in the wrong state")
-            if len(match.groups()) > 2:
-                indentation = None  # Empty line
-            elif len(match.groups()) == 2 and match.group(2) is not None:
-                indentation = match.group(2)
-            else:
-                indentation = None
-            if indentation:
-                if not ctx.indent_pattern:
-                    ctx.indent_pattern = indentation
-                elif not indentation.startswith(ctx.indent_pattern):
-                    raise InternalError("Indentation pattern on continued line does not match.")
-                ctx.value_text += "\n"
-                # Only move the position up to the level of the indentation pattern.
-                text = match.group(1) + match.group(2)[: len(ctx.indent_pattern)]
-                yield match.start(), Whitespace, text
-                ctx.pos = match.start() + len(text)
-            else:
-                yield match.start(), Whitespace, match.group(0)
-                ctx.pos = match.end()
+            end = self._parse_multi_line_line_break(match, ctx)
+            yield match.start(), Whitespace, match.string[match.start() : end]
+            ctx.pos = end
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_multi_line_line_break(self, match: re.Match, ctx: EclContext) -> int:
+        """Process a line-break in a multi-line text and return the position where the next line starts."""
+        if not ctx.value:
+            raise InternalError("Multi-line line-break in the wrong state")
+        if len(match.groups()) > 2:
+            indentation = None  # Empty line
+        elif len(match.groups()) == 2 and match.group(2) is not None:
+            indentation = match.group(2)
+        else:
+            indentation = None
+        if not indentation:
+            return match.end()
+        if not ctx.indent_pattern:
+            ctx.indent_pattern = indentation
+        elif not indentation.startswith(ctx.indent_pattern):
+            raise InternalError("Indentation pattern on continued line does not match.")
+        ctx.value_text_parts.append("\n")
+        # Only move the position up to the level of the indentation pattern.
+        return match.start(2) + len(ctx.indent_pattern)
+
     def process_multi_line_end(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Multi-line end in the wrong state")
-            if len(match.groups()) == 3:
-                indentation = match.group(2)
-            else:
-                indentation = match.group(4)
-            if not ctx.indent_pattern:
-                ctx.indent_pattern = indentation
-            elif not indentation.startswith(ctx.indent_pattern):
-                raise InternalError("Indentation pattern before closing sequence does not match.")
-            if indentation != ctx.indent_pattern:
+            if not self._parse_multi_line_end(match, ctx):
                 # This is not the end of the text.
                 if len(match.groups()) == 3:
                     if match.group(1):
@@ -1095,7 +1712,6 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
                         yield match.start(3), Whitespace, match.group(1)
                     ctx.pos = match.start(4) + len(ctx.indent_pattern)
                 return
-            ctx.value.data = ctx.value_text
             if len(match.groups()) == 3:
                 yield from self.yield_groups(
                     match,
@@ -1119,37 +1735,56 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
-        ctx.value_text = ""
-        ctx.indent_pattern = None
-        ctx.close_state()
+        self._close_text(ctx)
         ctx.stack.pop()
 
+    def _parse_multi_line_end(self, match: re.Match, ctx: EclContext) -> bool:
+        """Test a possible end of a multi-line text, return `True` if the text ends here."""
+        if not ctx.value:
+            raise InternalError("Multi-line end in the wrong state")
+        if len(match.groups()) == 3:
+            indentation = match.group(2)
+        else:
+            indentation = match.group(4)
+        if not ctx.indent_pattern:
+            ctx.indent_pattern = indentation
+        elif not indentation.startswith(ctx.indent_pattern):
+            raise InternalError("Indentation pattern before closing sequence does not match.")
+        if indentation != ctx.indent_pattern:
+            return False
+        ctx.value.data = ctx.value_text
+        return True
+
     def process_byte_data_start(self, match: re.Match, ctx: EclContext):
+        self._parse_byte_data_start(match, ctx)
+        yield from self.yield_groups(match, [String.Single, String.Affix])
+        ctx.pos = match.end()
+
+    def _parse_byte_data_start(self, match: re.Match, ctx: EclContext):
         self._value_processed(ctx)
-        try:
-            if ctx.value:
-                ctx.value_data = b""
-                ctx.value.type = ValueType.BYTES
-                ctx.value.data = b""
-            if match.group(1) == "<<<":
-                ctx.open_state(OpenState.MULTILINE_BYTE_DATA)
-            else:
-                ctx.open_state(OpenState.BYTE_DATA)
-            yield from self.yield_groups(match, [String.Single, String.Affix])
-            ctx.pos = match.end()
-        except InternalError as error:
-            yield from handle_error(self, match, ctx, str(error))
+        if ctx.value:
+            ctx.value_data = bytearray()
+            ctx.value.type = ValueType.BYTES
+            ctx.value.data = b""
+        if match.group(1) == "<<<":
+            ctx.open_state(OpenState.MULTILINE_BYTE_DATA)
+        else:
+            ctx.open_state(OpenState.BYTE_DATA)
 
     def process_byte_data_byte(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Byte-data in the wrong state")
-            ctx.value_data += bytes.fromhex(match.group(0))
+            self._parse_byte_data_byte(match, ctx)
             yield match.start(), Number.Hex, match.group(0)
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_byte_data_byte(self, match: re.Match, ctx: EclContext):
+        """Add one byte, or a run of bytes separated by spacing, to the current data."""
+        if not ctx.value:
+            raise InternalError("Byte-data in the wrong state")
+        ctx.value_data += bytes.fromhex(match.group(0))  # Skips all spacing between the bytes.
+
     def _handle_byte_data_line_break(self, match: re.Match, ctx: EclContext):
         if match.group(1):
             yield match.start(1), Whitespace, match.group(1)  # Optional spacing at end of line
@@ -1158,45 +1793,62 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         yield match.start(3), Whitespace, match.group(3)  # Line-break
         if len(match.groups()) >= 4:
             yield match.start(4), Whitespace, ctx.indent_pattern  # Indent pattern
+        ctx.pos = self._byte_data_line_end(match, ctx)
+
+    def _byte_data_line_end(self, match: re.Match, ctx: EclContext) -> int:
+        """Get the position where the next line of byte-data starts."""
+        if len(match.groups()) >= 4:
             # Only move the position up to the level of the indentation pattern.
-            ctx.pos = match.start(4) + len(ctx.indent_pattern)
-        else:  # Empty line
-            ctx.pos = match.end()
+            return match.start(4) + len(ctx.indent_pattern)
+        return match.end()  # Empty line
 
     def process_byte_data_line_break(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Byte-data line-break in the wrong state")
-            if len(match.groups()) >= 4:  # Only test indentation if this isn't an empty line.
-                indentation = match.group(4)
-                if not ctx.indent_pattern:
-                    ctx.indent_pattern = indentation
-                elif not indentation.startswith(ctx.indent_pattern):
-                    raise InternalError("Indentation pattern on continued line does not match.")
+            self._parse_byte_data_line_break(match, ctx)
             yield from self._handle_byte_data_line_break(match, ctx)
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_byte_data_line_break(self, match: re.Match, ctx: EclContext):
+        if not ctx.value:
+            raise InternalError("Byte-data line-break in the wrong state")
+        if len(match.groups()) >= 4:  # Only test indentation if this isn't an empty line.
+            indentation = match.group(4)
+            if not ctx.indent_pattern:
+                ctx.indent_pattern = indentation
+            elif not indentation.startswith(ctx.indent_pattern):
+                raise InternalError("Indentation pattern on continued line does not match.")
+
     def process_byte_data_end(self, match: re.Match, ctx: EclContext):
         try:
-            if not ctx.value:
-                raise InternalError("Byte-data in the wrong state")
+            if not self._parse_byte_data_end(match, ctx):
+                yield from self._handle_byte_data_line_break(match, ctx)
+                return
             if ctx.open_states[-1] == OpenState.MULTILINE_BYTE_DATA:
-                indentation = match.group(4)
-                if ctx.indent_pattern:  # Only test the indent pattern if we got one.
-                    if not indentation.startswith(ctx.indent_pattern):
-                        raise InternalError("Indentation pattern on continued line does not match.")
-                    if indentation != ctx.indent_pattern:  # This is not the end, just a regular line.
-                        yield from self._handle_byte_data_line_break(match, ctx)
-                        return
                 yield from self.yield_groups(match, [Whitespace, Comment, Whitespace, Whitespace, String.Single])
             else:
                 yield match.start(), String.Single, match.group(0)
-            ctx.value.data = ctx.value_data
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
-        ctx.value_data = b""
+        self._close_byte_data(ctx)
+
+    def _parse_byte_data_end(self, match: re.Match, ctx: EclContext) -> bool:
+        """Test a possible end of byte-data, return `True` if the byte-data ends here."""
+        if not ctx.value:
+            raise InternalError("Byte-data in the wrong state")
+        if ctx.open_states[-1] == OpenState.MULTILINE_BYTE_DATA:
+            indentation = match.group(4)
+            if ctx.indent_pattern:  # Only test the indent pattern if we got one.
+                if not indentation.startswith(ctx.indent_pattern):
+                    raise InternalError("Indentation pattern on continued line does not match.")
+                if indentation != ctx.indent_pattern:  # This is not the end, just a regular line.
+                    return False
+        ctx.value.data = bytes(ctx.value_data)
+        return True
+
+    def _close_byte_data(self, ctx: EclContext):
+        ctx.value_data = bytearray()
         ctx.indent_pattern = None
         ctx.close_state()
 
@@ -1217,106 +1869,116 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         return value
 
     def process_byte_count(self, match: re.Match, ctx: EclContext):
-        self._value_processed(ctx)
         try:
-            value = self._convert_integer(match.group(1))
-            suffix = match.group(3).lower()
-            if suffix not in self.BYTE_COUNT_FACTORS:
-                raise InternalError("This byte count exceeds the valid number range.")
-            value *= self.BYTE_COUNT_FACTORS[suffix]
-            if value >= 0 and value.bit_length() > 63:
-                raise InternalError("The number exceeds the valid number range.")
-            if value < 0 and (abs(value) - 1).bit_length() > 63:
-                raise InternalError("The negative number exceeds the valid number range.")
-            ctx.value.type = ValueType.INTEGER
-            ctx.value.data = value
+            self._parse_byte_count(match, ctx)
             yield from self.yield_groups(match, [Number.Integer, Whitespace, Keyword.Type])
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
-    def process_time_delta(self, match: re.Match, ctx: EclContext):
+    def _parse_byte_count(self, match: re.Match, ctx: EclContext):
         self._value_processed(ctx)
+        value = self._convert_integer(match.group(1))
+        suffix = match.group(3).lower()
+        if suffix not in self.BYTE_COUNT_FACTORS:
+            raise InternalError("This byte count exceeds the valid number range.")
+        value *= self.BYTE_COUNT_FACTORS[suffix]
+        if value >= 0 and value.bit_length() > 63:
+            raise InternalError("The number exceeds the valid number range.")
+        if value < 0 and (abs(value) - 1).bit_length() > 63:
+            raise InternalError("The negative number exceeds the valid number range.")
+        ctx.value.type = ValueType.INTEGER
+        ctx.value.data = value
+
+    def process_time_delta(self, match: re.Match, ctx: EclContext):
         try:
-            value = self._convert_integer(match.group(1))
-            suffix = match.group(3).lower()
-            ctx.value.type = ValueType.TIME_DELTA
-            ctx.value.data = (value, suffix)
+            self._parse_time_delta(match, ctx)
             yield from self.yield_groups(match, [Number.Integer, Whitespace, Keyword.Type])
             ctx.pos = match.end()
         except InternalError as error:
             yield from handle_error(self, match, ctx, str(error))
 
+    def _parse_time_delta(self, match: re.Match, ctx: EclContext):
+        self._value_processed(ctx)
+        value = self._convert_integer(match.group(1))
+        suffix = match.group(3).lower()
+        ctx.value.type = ValueType.TIME_DELTA
+        ctx.value.data = (value, suffix)
+
+    # The rules for all values, with the characters they can start with. Each rule replaces the `single_value`
+    # state with the given states.
+    SINGLE_VALUE_RULES = _first_char_table(
+        [
+            ("tfyneodTFYNEOD", RE_BOOLEAN, process_bool_value, ()),
+            (FIRST_DIGITS + "tT", RE_DATE_TIME, process_date_value, ()),
+            ("+-iInN", RE_FLOAT_LITERAL, process_float_value, ()),
+            ("+-." + FIRST_DIGITS, RE_FLOAT, process_float_value, ()),
+            ("+-" + FIRST_DIGITS, RE_BYTE_COUNT, process_byte_count, ()),
+            ("+-" + FIRST_DIGITS, RE_TIME_DELTA, process_time_delta, ()),
+            ("+-" + FIRST_DIGITS, RE_HEX_INTEGER, process_hex_value, ()),
+            ("+-" + FIRST_DIGITS, RE_BIN_INTEGER, process_bin_value, ()),
+            ("+-" + FIRST_DIGITS, RE_DEC_INTEGER, process_dec_value, ()),
+            ('"', r'"""', process_multi_line_text_start, ("text_multi_line", "text_multi_line_after_start")),
+            ('"', r'"', process_text_start, ("text",)),
+            (
+                "`",
+                RE_MULTI_LINE_CODE_START,
+                process_multi_line_code_start,
+                ("code_multi_line", "code_multi_line_after_start"),
+            ),
+            ("`", r"`", process_code_start, ("code",)),
+            (
+                "/",
+                RE_MULTI_LINE_REGEX_START,
+                process_multi_line_regex_start,
+                ("regex_multi_line", "regex_multi_line_after_start"),
+            ),
+            ("/", r"/", process_regex_start, ("regex",)),
+            (
+                "<",
+                RE_MULTI_LINE_BYTE_DATA_START,
+                process_byte_data_start,
+                ("byte_data_multi_line", "byte_data_after_start"),
+            ),
+            ("<", RE_BYTE_DATA_START, process_byte_data_start, ("byte_data",)),
+        ],
+        flags,
+    )
+    SINGLE_VALUE_START = "(?=[" + re.escape("".join(SINGLE_VALUE_RULES)) + "])"
+
+    def process_single_value(self, match: re.Match, ctx: EclContext):
+        """Try only the value rules that can start with the current character."""
+        for rule_match, action, new_states in self.SINGLE_VALUE_RULES[ctx.text[ctx.pos]]:
+            if value_match := rule_match(ctx.text, ctx.pos, ctx.end):
+                yield from action(self, value_match, ctx)
+                if len(ctx.stack) > 1:
+                    ctx.stack.pop()
+                ctx.stack.extend(new_states)
+                return
+        # Like the lexer, if no rule matches: Mark the character as error and stay in this state.
+        yield ctx.pos, Error, ctx.text[ctx.pos]
+        ctx.pos += 1
+
     tokens = {
         "root": [
             (RE_END_OF_LINE, bygroups(Whitespace, Comment, Whitespace)),
             # Error handling: Mark the whole section as error for better effect.
-            (
-                r"""(?x)
-                    -* \*? \[ (?:                      # Section start
-                        (?: [ \t] | \. )*              #   Error: No actual content
-                    |
-                        [ \t]* " [^\]]+?               #   Error: Starts with text value.
-                    ) \] \*? -*                        # Section end
-                """,
-                section_error,
-                "line_end",
-            ),
+            (RE_SECTION_ERROR, section_error, "line_end"),
             # Section Start
-            (r"(-*\*?)(\[)([ \t]*)(\.)?", section_start, ("line_end", "section_names")),
+            (RE_SECTION_START, section_start, ("line_end", "section_names")),
             # Named value or meta value
-            (r"(?i)(?=@?[a-z\"])", Whitespace, "value_name"),
+            (RE_VALUE_NAME_START, Whitespace, "value_name"),
             # Error handling for ctrl characters.
-            (r"[\x00-\x08\x0A-\x1F\x7F-\x9F]+", handle_error),
+            (RE_CONTROL_CHARACTERS, handle_error),
         ],
         "section_names": [
             (RE_SPACING, Whitespace),
             # Name/Text, Section End/Name Separator
-            (
-                r"""(?xi)
-                (                                             # (1)
-                    [a-z][a-z0-9]*(?:[ _][a-z0-9]+)*          # Name
-                |                                             # or
-                    " (?: \\                                  # Text start with double quote
-                        (?: [\\"$nrt] | u (?:                 #   Handle an escape sequence
-                            [a-fA-F0-9]{4} |
-                            \{ [a-fA-F0-9]{1,8} \}
-                        ) )
-                    |
-                        [^\x00-\x08\x0A-\x1F\x7F-\x9F\\"]+   #   Or any non-reserved, non-control character
-                    )* "                                      # Text end with double quote
-                )  
-                ( [ \t]* )                                    # (2) Optional spacing
-                (?: (\]) | (\.) )                             # (3)(4) Name separator or section end
-                (?(3)                                         # If section end ... 
-                    (\*? -*)                                  # (5) Match optional star and dash
-                    |                                         # ... else ...
-                    ([ \t]*)                                  # (6) Optional whitespace 
-                )                    
-                """,
-                section_name_part,
-            ),
+            (RE_SECTION_NAME_PART, section_name_part),
         ],
         "value_name": [
             # Name, Meta Name or Text
-            (
-                r"""(?xi)
-                    (?:                                            # (1)
-                        @?[a-z][a-z0-9]*(?:[ _][a-z0-9]+)*         # Name or Meta Name
-                    |                                              # or
-                        " (?: \\                                   # Text start with double quote
-                            (?: [\\"$nrt] | u (?:                  #   Handle an escape sequence
-                                [a-fA-F0-9]{4} |
-                                \{ [a-fA-F0-9]{1,8} \}
-                            ) )
-                        |
-                            [^\x00-\x08\x0A-\x1F\x7F-\x9F\\"]+     #   Or any non-reserved, non-control character
-                        )* "                                       # Text end with double quote
-                    )
-                """,
-                process_value_name,
-                ("#pop", "value_after_name", "value_separator"),
-            ),
+            (RE_VALUE_NAME, process_value_name, ("#pop", "value_after_name", "value_separator")),
         ],
         "value_separator": [
             (RE_SPACING, Whitespace),
@@ -1363,26 +2025,10 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
         "comma_list": [
             # Empty line => end of list.
             (RE_END_OF_LINE, bygroups(Whitespace, Comment, Whitespace), "#pop"),
-            (  # Early catch the error with a trailing comma.
-                r"""(?x)
-                    ( [ \t]* )                               # Optional spacing.
-                    ( , )                                    # Trailing comma.
-                    ( [ \t]* )                               # Optional spacing.
-                    ( \# [^\x00-\x08\x0A-\x1F\x7F-\x9F]* )?  # Optional comment.
-                    ( \n | \r\n )                            # Line break.
-                """,
-                bygroups(Whitespace, Error, Whitespace, Comment, Whitespace),
-                "#pop",
-            ),
-            (  # If we get a comma after the value, and something else, expect another value.
-                r"""(?x)
-                ( [ \t]* )
-                ( , )
-                ( [ \t]* )
-                """,
-                process_comma,
-                ("#pop", "comma_list", "single_value"),
-            ),
+            # Early catch the error with a trailing comma.
+            (RE_TRAILING_COMMA, bygroups(Whitespace, Error, Whitespace, Comment, Whitespace), "#pop"),
+            # If we get a comma after the value, and something else, expect another value.
+            (RE_COMMA, process_comma, ("#pop", "comma_list", "single_value")),
         ],
         "single_value": [
             (
@@ -1390,180 +2036,26 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
                 handle_error,
                 "#pop",
             ),  # Early catch common errors with starting comma or consecutive ones.
-            include("boolean"),
-            include("date_time"),
-            include("float"),
-            include("date_time"),
-            include("byte_counts"),
-            include("time_deltas"),
-            include("integer"),
-            include("text_multi_line_start"),
-            include("text_start"),
-            include("code_multi_line_start"),
-            include("code_start"),
-            include("regex_multi_line_start"),
-            include("regex_start"),
-            include("byte_data_multi_line_start"),
-            include("byte_data_start"),
-        ],
-        "boolean": [
-            (
-                r"(?i)(true|false|yes|no|enabled|disabled|on|off)",
-                process_bool_value,
-                "#pop",
-            ),
-        ],
-        "integer": [
-            (
-                r"""(?xi)
-                [-+]?                                    # Positive or negative sign
-                0x                                       # Hex prefix
-                (?: [a-f0-9]+ \u0027 )* [a-f0-9]+        # Hex digits groups, optional '
-                """,
-                process_hex_value,
-                "#pop",
-            ),
-            (
-                r"""(?xi)
-                [-+]?                                    # Positive or negative sign
-                0b                                       # Binary prefix
-                (?: [01]+ \u0027 )* [01]+                # Binary digits groups, optional '
-                """,
-                process_bin_value,
-                "#pop",
-            ),
-            (
-                r"""(?xi)
-                [-+]?                                    # Positive or negative sign
-                (?: \d+ \u0027 )* \d+                    # Integer digits groups, optional '
-                """,
-                process_dec_value,
-                "#pop",
-            ),
-        ],
-        "float": [
-            (
-                r"""(?xi)
-                [-+]?
-                (?: inf | nan )
-                """,
-                process_float_value,
-                "#pop",
-            ),
-            (
-                r"""(?xi)
-                [-+]?                                      # Positive or negative sign.
-                (?:
-                    (?:                                    # [X].Y[E+Z] notation.
-                        (?: (?: \d+ \u0027 )* \d+ )? \. (?: \d+ \u0027 )* \d+
-                    |                                      # X.[Y][E+Z] notation.
-                        (?: \d+ \u0027 )* \d+ \. (?: (?: \d+ \u0027 )* \d+ )?
-                    )
-                    (?:
-                        e[-+]? \d+
-                    )?
-                |                                          # XE+Z notation.
-                    (?: \d+ \u0027 )* \d+
-                    e[-+]? \d+
-                )
-                """,
-                process_float_value,
-                "#pop",
-            ),
-        ],
-        "date_time": [
-            (
-                r"""(?ix)
-                (
-                    \d{4} - (?: 0[1-9] | 1[0-2] ) - (?: 0[1-9] | [12]\d | 3[01] )
-                    [ t]?
-                    (?: [01]\d | 2[0-3] ) : ( [0-5]\d )
-                    (?: : [0-5]\d (?: \. \d{1,9} )? )?
-                    (?: z | [-+] (?: [01]\d | 2[0-3] ) (?: : [0-5]\d )? )?
-                |
-                    \d{4} - (?: 0[1-9] | 1[0-2] ) - (?: 0[1-9] | [12]\d | 3[01] )
-                |
-                    t?
-                    (?: [01]\d | 2[0-3] ) : (?: [0-5]\d )
-                    (?: : [0-5]\d (?: \. \d{1,9} )? )?
-                    (?: z | [-+] (?: [01]\d | 2[0-3] ) (?: : [0-5]\d )? )?
-                )
-                """,
-                process_date_value,
-                "#pop",
-            ),
-        ],
-        "byte_counts": [
-            (
-                r"""(?ix)
-                (
-                    [-+]?                                # Positive or negative sign
-                    (?: \d+ \u0027 )* \d+                # Integer digits with optional '
-                )
-                ( \x20 )?                                # Optional space between digits and unit
-                ( [kmgtpezy] i? b )                      # Iso unit up to yota-bytes
-                """,
-                process_byte_count,
-                "#pop",
-            ),
-        ],
-        "time_deltas": [
-            (
-                r"""(?ix)
-                (
-                    [-+]?                                # Positive or negative sign
-                    (?: \d+ \u0027 )* \d+                # Integer digits with optional '
-                )
-                ( \x20 )?                                # Optional space before the unit.
-                (
-                    nanoseconds? | ns |
-                    microseconds? | us | µs |
-                    milliseconds? | ms |
-                    seconds? | s |
-                    minutes? | m |
-                    hours? | h |
-                    days? | d |
-                    weeks? | w |
-                    months? |
-                    years?
-                )
-                """,
-                process_time_delta,
-                "#pop",
-            ),
-        ],
-        "text_start": [
-            (r'"', process_text_start, ("#pop", "text")),
+            (SINGLE_VALUE_START, process_single_value),
         ],
         "text": [
             include("text_escape"),
             # End of text.
             (r'"', process_text_end, "#pop"),
             include("text_placeholder"),
-            (r'[^\x00-\x08\x0A-\x1F\x7F-\x9F\\"$]+', process_text_char),
-        ],
-        "text_multi_line_start": [
-            (
-                r'"""',
-                process_multi_line_text_start,
-                ("#pop", "text_multi_line", "text_multi_line_after_start"),
-            ),
+            (RE_TEXT_CHARACTERS, process_text_char),
         ],
         "text_multi_line_after_start": [
             # Handle the special case of an empty line.
-            (
-                RE_END_OF_LINE + r"(?=[ \t]*\n|\r\n)",
-                process_multi_line_line_break,
-                "#pop",
-            ),
+            (RE_MULTI_LINE_EMPTY_FIRST_LINE, process_multi_line_line_break, "#pop"),
             # Handle the special case of an early end.
             (RE_END_OF_LINE + r'([ \t]+)(""")', process_multi_line_end, "#pop"),
             # Everything else must be content.
-            (RE_END_OF_LINE + r"([ \t]+)", process_after_multi_line_start, "#pop"),
+            (RE_MULTI_LINE_FIRST_LINE, process_after_multi_line_start, "#pop"),
         ],
         "multi_line_line_break": [
-            (r"(\n|\r\n)([ \t]+)", process_multi_line_line_break),
-            (r"(\n|\r\n)(?=\n|\r\n)", process_multi_line_line_break),
+            (RE_MULTI_LINE_LINE_BREAK, process_multi_line_line_break),
+            (RE_MULTI_LINE_EMPTY_LINE, process_multi_line_line_break),
         ],
         "text_multi_line": [
             # End of text.
@@ -1574,51 +2066,34 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
             include("multi_line_line_break"),
             include("text_escape"),
             include("text_placeholder"),
-            (r"([ \t]+)(\n|\r\n)?", process_multi_line_spacing),
-            (r"[^\x00-\x08\x0A-\x1F\x7F-\x9F\\$ \t]+", process_multi_line_text),
+            (RE_MULTI_LINE_SPACING, process_multi_line_spacing),
+            (RE_MULTI_LINE_TEXT_CHARACTERS, process_multi_line_text),
         ],
         "text_placeholder": [
             # Just a $ is perfectly valid.
-            (r"(?ix) \$ (?!\{)", process_text_char),
+            (RE_PLACEHOLDER_DOLLAR, process_text_char),
             # Empty placeholder is not valid.
-            (r"(?ix) \$ \{ \}", handle_error),
+            (RE_PLACEHOLDER_EMPTY, handle_error),
             # Placeholder
-            (r"(?ix) \$ \{ [-=.: _a-z0-9]+ \}", process_text_char),
+            (RE_PLACEHOLDER, process_text_char),
             # Open placeholder is not valid.
-            (r"(?ix) \$ \{ [-=.: _a-z0-9]*", handle_error),
+            (RE_PLACEHOLDER_OPEN, handle_error),
         ],
         "text_escape": [
-            (
-                r'(?ix) \\ ( [\\"$nrt] | u (?: [a-f0-9]{4} | \{ [a-f0-9]{1,8} \} ) )',
-                process_text_escape,
-            ),
-        ],
-        "code_start": [
-            (r"`", process_code_start, ("#pop", "code")),
+            (RE_TEXT_ESCAPE_SEQUENCE, process_text_escape),
         ],
         "code": [
             # End of code.
             (r"`", process_text_end, "#pop"),
-            (r"[^\x00-\x08\x0A-\x1F\x7F-\x9F`]+", process_text_char),
-        ],
-        "code_multi_line_start": [
-            (
-                r"(```)(\w{1,16})?",
-                process_multi_line_code_start,
-                ("#pop", "code_multi_line", "code_multi_line_after_start"),
-            ),
+            (RE_CODE_CHARACTERS, process_text_char),
         ],
         "code_multi_line_after_start": [
             # Handle the special case of an empty line.
-            (
-                RE_END_OF_LINE + r"(?=[ \t]*\n|\r\n)",
-                process_multi_line_line_break,
-                "#pop",
-            ),
+            (RE_MULTI_LINE_EMPTY_FIRST_LINE, process_multi_line_line_break, "#pop"),
             # Handle the special case of an early end.
             (RE_END_OF_LINE + r"([ \t]+)(```)", process_multi_line_end, "#pop"),
             # Everything else must be content.
-            (RE_END_OF_LINE + r"([ \t]+)", process_after_multi_line_start, "#pop"),
+            (RE_MULTI_LINE_FIRST_LINE, process_after_multi_line_start, "#pop"),
         ],
         "code_multi_line": [
             # End of code.
@@ -1627,10 +2102,7 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
                 process_multi_line_end,
             ),  # function will decide if this pops the stack.
             include("multi_line_line_break"),
-            (r"[^\x00-\x08\x0A-\x1F\x7F-\x9F]+", process_text_char),
-        ],
-        "regex_start": [
-            (r"/", process_regex_start, ("#pop", "regex")),
+            (RE_MULTI_LINE_CODE_CHARACTERS, process_text_char),
         ],
         "regex": [
             include("regex_escape"),
@@ -1639,24 +2111,13 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
             (r"/", process_text_end, "#pop"),
             include("regex_anything"),
         ],
-        "regex_multi_line_start": [
-            (
-                r"(///)([ \t]*)",
-                process_multi_line_regex_start,
-                ("#pop", "regex_multi_line", "regex_multi_line_after_start"),
-            ),
-        ],
         "regex_multi_line_after_start": [
             # Handle the special case of an empty line.
-            (
-                RE_END_OF_LINE + r"(?=[ \t]*\n|\r\n)",
-                process_multi_line_line_break,
-                "#pop",
-            ),
+            (RE_MULTI_LINE_EMPTY_FIRST_LINE, process_multi_line_line_break, "#pop"),
             # Handle the special case of an early end.
             (RE_END_OF_LINE + r"([ \t]+)(///)", process_multi_line_end, "#pop"),
             # Everything else must be content.
-            (RE_END_OF_LINE + r"([ \t]+)", process_after_multi_line_start, "#pop"),
+            (RE_MULTI_LINE_FIRST_LINE, process_after_multi_line_start, "#pop"),
         ],
         "regex_multi_line": [
             # End of regex.
@@ -1672,74 +2133,1151 @@ class ErbslandConfigurationLanguage(ExtendedRegexLexer):
             include("regex_anything"),
         ],
         "regex_escape": [
-            (
-                r"""(?x)
-                \\ (
-                    x[a-fA-F0-9]{2} |
-                    u[a-fA-F0-9]{4} |
-                    U[a-fA-F0-9]{8} |
-                    N\{ [^}]*? \} |
-                    [^\x00-\x08\x0A-\x1F\x7F-\x9F]
-                )
-                """,
-                String.Escape,
-            ),
+            (RE_REGEX_ESCAPE, String.Escape),
         ],
         "regex_comment": [
-            (
-                r"""(?x)
-                ( \# [^\x00-\x08\x0A-\x1F\x7F-\x9F]* )
-                (?= \n | \r\n )
-                """,
-                Comment,
-            ),
+            (RE_REGEX_COMMENT, Comment),
         ],
         "regex_special": [
-            (r"[-.^$*+?]", Operator),
+            (RE_REGEX_OPERATOR, Operator),
             (r"#", String.Regex),
-            (r"[\x28\x29\x5B\x5D\x7B-\x7D]", Punctuation),
+            (RE_REGEX_PUNCTUATION, Punctuation),
         ],
         "regex_anything": [
-            (
-                r"[^\x00-\x08\x0A-\x1F\x7F-\x9F\\/\x28\x29\x2d\x5B\x5D\x7B-\x7D.^$*+?#]+",
-                String.Regexp,
-            ),
-        ],
-        "byte_data_start": [
-            (r"(<)(hex:)?", process_byte_data_start, ("#pop", "byte_data")),
+            (RE_REGEX_CHARACTERS, String.Regexp),
         ],
         "byte_data": [
             (RE_SPACING, Whitespace),
             # Hex byte.
-            (r"[a-fA-F0-9]{2}", process_byte_data_byte),
+            (RE_BYTE_DATA_BYTE, process_byte_data_byte),
             # End of binary.
             (r">", process_byte_data_end, "#pop"),
         ],
-        "byte_data_multi_line_start": [
-            (
-                r"(<<<)(hex)?",
-                process_byte_data_start,
-                ("#pop", "byte_data_multi_line", "byte_data_after_start"),
-            ),
-        ],
         "byte_data_after_start": [
             # Handle the special case of an empty line.
-            (
-                RE_END_OF_LINE + r"(?=[ \t]*\n|\r\n)",
-                process_byte_data_line_break,
-                "#pop",
-            ),
+            (RE_MULTI_LINE_EMPTY_FIRST_LINE, process_byte_data_line_break, "#pop"),
             # Handle the special case of an early end.
             (RE_END_OF_LINE + r"([ \t]+)(>>>)", process_byte_data_end, "#pop:2"),
             # Everything else must be content.
-            (RE_END_OF_LINE + r"([ \t]+)", process_byte_data_line_break, "#pop"),
+            (RE_MULTI_LINE_FIRST_LINE, process_byte_data_line_break, "#pop"),
         ],
         "byte_data_multi_line": [
             # Handle the special case of an empty line
-            (RE_END_OF_LINE + r"(?=[ \t]*\n|\r\n)", process_byte_data_line_break),
+            (RE_MULTI_LINE_EMPTY_FIRST_LINE, process_byte_data_line_break),
             (RE_END_OF_LINE + r"([ \t]+)(>>>)", process_byte_data_end, "#pop"),
-            (RE_END_OF_LINE + r"([ \t]+)", process_byte_data_line_break),
+            (RE_MULTI_LINE_FIRST_LINE, process_byte_data_line_break),
             (RE_SPACING, Whitespace),
             (r"([a-fA-F0-9]{2})", process_byte_data_byte),
         ],
     }
+
+
+class ValueTreeParser:
+    """
+    A parse-only engine, that builds the value tree without creating any Pygments tokens.
+
+    The parser mirrors the states of `ErbslandConfigurationLanguage.tokens` and uses the same regular expressions
+    and checks from the lexer. Each rule is stored with the characters it can start with, so only rules that can
+    possibly match at the current position are tried. Parsing stops at the first error, unless the parser
+    collects diagnostics. In this case, it records each error and resumes at the next line that starts a new
+    value, or at the next section if the error was in a section name.
+    """
+
+    def __init__(
+        self,
+        lexer: ErbslandConfigurationLanguage,
+        document_path: Optional[Path] = None,
+        nesting_level: int = 1,
+        include_stack: tuple[Path, ...] = (),
+    ):
+        """
+        :param lexer: The lexer with the checks for all values.
+        :param document_path: The path of the parsed document, used to resolve relative includes.
+        :param nesting_level: The nesting level of the document, starting with 1 for the main document.
+        :param include_stack: The resolved paths of all documents that include this document.
+        """
+        self.lexer = lexer
+        self.document_path = document_path
+        self.nesting_level = nesting_level
+        self.include_stack = include_stack + ((document_path.resolve(),) if document_path else ())
+        self.dependencies: dict[Path, int] = {}  # The included documents, with their modification times.
+        self.depth = 1  # The number of nesting levels, of this document and all included documents.
+        self.is_validating = False  # Report a detailed message for every error.
+        self.diagnostics: Optional[list[Diagnostic]] = None  # If set, errors are collected and parsing goes on.
+        self._line_table = LineOffsetTable()  # The lines of the document, only built while collecting diagnostics.
+        self._offset = 0  # The position of the parsed text in the document.
+        self._is_resynchronizing = False  # If lines are skipped after an error.
+        self._resync_to_section = False  # If lines are skipped up to the next section, set for section errors.
+
+    def _create_context(self, text: str) -> EclContext:
+        ctx = EclContext(text, 0)
+        ctx.resolve_includes = self.lexer.include_resolver is not None
+        return ctx
+
+    def parse(self, text: str) -> Value:
+        """
+        Parse the given text and return the root of the value tree.
+
+        :raises: DocumentError at the first error in the document.
+        :raises: InternalError if the parser got into an invalid state.
+        """
+        ctx = self._create_context(text)
+        if self.diagnostics is not None:
+            self._line_table.add_text(text, 0)
+        try:
+            ctx.pos = self._parse_text(ctx, text, 0, len(text), len(text), True)
+            return self._finish_document(ctx)
+        except DocumentError as error:
+            error.set_location(text)
+            raise
+
+    def parse_chunks(self, chunks: Iterable[str]) -> Value:
+        """
+        Parse a document that is read in chunks and return the root of the value tree.
+
+        No rule reads further than into the next line, so the parser only keeps a window of complete lines
+        and parses each line as soon as the line after it is available. The memory used while parsing depends
+        on the size of the chunks and the longest line, not on the size of the document.
+
+        :raises: DocumentError at the first error in the document.
+        :raises: InternalError if the parser got into an invalid state.
+        """
+        ctx = self._create_context("")
+        window = ""
+        self._offset = 0  # The position of the window in the document.
+        read_count = 0  # The number of characters read from the document.
+        line_offset = 0  # The number of lines before the window.
+        column_offset = 0  # The number of characters before the window, on its first line.
+        pos = 0
+        try:
+            for chunk in chunks:
+                if self.diagnostics is not None:
+                    self._line_table.add_text(chunk, read_count)
+                    read_count += len(chunk)
+                window += chunk
+                end = window.rfind("\n") + 1  # The end of the last complete line.
+                stop = window.rfind("\n", 0, end - 1) + 1  # The start of the last complete line.
+                pos = self._parse_text(ctx, window, pos, stop, end, False)
+                if (line_start := window.rfind("\n", 0, pos) + 1) > 0:
+                    line_offset += window.count("\n", 0, line_start)
+                    column_offset = 0
+                column_offset += pos - line_start
+                window = window[pos:]
+                self._offset += pos
+                pos = 0
+            ctx.pos = self._parse_text(ctx, window, pos, len(window), len(window), True)
+            root = self._finish_document(ctx)
+        except DocumentError as error:
+            error.set_location(window, line_offset, column_offset)
+            error.pos += self._offset
+            raise
+        return root
+
+    def _parse_text(self, ctx: EclContext, text: str, pos: int, stop: int, end: int, is_final: bool) -> int:
+        """
+        Parse the text from `pos`, until the position reaches `stop`, and return the new position.
+
+        While collecting diagnostics, errors are recorded and parsing resumes after each error.
+        """
+        if self.diagnostics is None:
+            return self._parse_rules(ctx, text, pos, stop, end, is_final)
+        while True:
+            if self._is_resynchronizing:
+                pos = self._skip_to_resync_point(text, pos, end)
+                if self._is_resynchronizing:
+                    return pos  # All lines of this text were skipped.
+            try:
+                return self._parse_rules(ctx, text, pos, stop, end, is_final)
+            except DocumentError as error:
+                pos = self._resynchronize(ctx, text, error.pos, end)
+                self.add_diagnostic(error, self._offset + error.pos)
+
+    def _resynchronize(self, ctx: EclContext, text: str, pos: int, end: int) -> int:
+        """Reset the state after an error at `pos`, and return the start of the next line."""
+        # Values after a broken section name would only repeat errors, so skip them up to the next section.
+        self._resync_to_section = self._resync_to_section or ctx.stack[-1] == "section_names"
+        self._is_resynchronizing = True
+        del ctx.stack[1:]
+        ctx.open_states.clear()
+        ctx.pending_include = None
+        ctx.section_error_message = ""
+        line_end = text.find("\n", pos, end)
+        return line_end + 1 if line_end >= 0 else end
+
+    def _skip_to_resync_point(self, text: str, pos: int, end: int) -> int:
+        """Skip all lines that continue the part with the error, starting at the line start `pos`."""
+        while pos < end:
+            if self._resync_to_section:
+                is_resync_point = text[pos] in "-*["
+            else:
+                is_resync_point = text[pos] not in " \t\r\n"  # Not a continued or empty line.
+            if is_resync_point:
+                self._is_resynchronizing = False
+                self._resync_to_section = False
+                break
+            line_end = text.find("\n", pos, end)
+            pos = line_end + 1 if line_end >= 0 else end
+        return pos
+
+    def add_diagnostic(self, error: DocumentError, pos: int):
+        """Record an error at the position `pos` in the document."""
+        line, column = self._line_table.location(pos)
+        error.pos = pos
+        self.diagnostics.append(Diagnostic.from_error(error, line, column))
+
+    def _parse_rules(self, ctx: EclContext, text: str, pos: int, stop: int, end: int, is_final: bool) -> int:
+        """
+        Match the rules from `pos`, until the position reaches `stop`, and return the new position.
+
+        Rules never match beyond `end`. If `is_final` is set, `end` is the end of the document, and the parser
+        runs until no rule matches at the end of the text.
+        """
+        states = self.STATES
+        stack = ctx.stack
+        rules_by_char, default_rules = states[stack[-1]]
+        while is_final or pos < stop:
+            rules = rules_by_char.get(text[pos], default_rules) if pos < end else default_rules
+            for rule_match, action, pop_count, new_states in rules:
+                match = rule_match(text, pos, end)
+                if not match:
+                    continue
+                if action is None:
+                    pos = match.end()
+                else:
+                    action(self, match, ctx)
+                    pos = ctx.pos
+                if pop_count:
+                    del stack[max(1, len(stack) - pop_count) :]
+                if new_states:
+                    stack.extend(new_states)
+                rules_by_char, default_rules = states[stack[-1]]
+                break
+            else:
+                if pos >= end:
+                    break
+                if text[pos] == "\n":
+                    # Same as the lexer: At the end of a line, reset the state to "root".
+                    del stack[1:]
+                    rules_by_char, default_rules = states["root"]
+                    pos += 1
+                    continue
+                raise DocumentError(pos, text[pos], self.UNEXPECTED_TEXT if self.is_validating else self.FAILED)
+        return pos
+
+    def _finish_document(self, ctx: EclContext) -> Value:
+        if ctx.pending_include is not None:
+            self._error(ctx.pos, "", self.INCLUDE_WITHOUT_TEXT)
+        if ctx.open_states:
+            if ctx.open_states[-1] == OpenState.NAME:
+                message = f"Name or text with no value at end of document."
+            else:
+                message = f'Unmatched open "{ctx.open_states[-1]}"'
+            raise DocumentError(ctx.pos, message, message if self.is_validating else self.FAILED)
+        ctx.root.type = ValueType.DOCUMENT
+        return ctx.root
+
+    FAILED = "Failed to parse document."
+    UNEXPECTED_TEXT = "Unexpected text."
+
+    def _error(self, pos: int, text: str, error_message: str = ""):
+        """Raise the same error, that `get_value_tree` raises for the first error token of the lexer."""
+        if self.is_validating:
+            error_message = error_message or self.UNEXPECTED_TEXT
+        elif not self.lexer.error_tracing_enabled:
+            error_message = self.FAILED
+        raise DocumentError(pos, text, error_message)
+
+    def _handle_error(self, match: re.Match, ctx: EclContext):
+        self._error(match.pos, match.group(0))
+
+    def _handle_trailing_comma(self, match: re.Match, ctx: EclContext):
+        message = "A trailing comma is not allowed." if self.is_validating else self.FAILED
+        raise DocumentError(match.start(2), match.group(2), message)
+
+    def _parse_line_start(self, match: re.Match, ctx: EclContext, parse_function: Callable, *args):
+        """
+        Run the parse function for a section or name, that starts a new line.
+
+        While collecting diagnostics, an error about a value left open on previous lines is recorded, and the line
+        is parsed again without the open value. This way, the line after an incomplete value is not skipped.
+        """
+        is_open = bool(ctx.open_states)
+        try:
+            parse_function(*args)
+        except InternalError as error:
+            if not is_open or self.diagnostics is None:
+                raise
+            self.add_diagnostic(DocumentError(match.pos, match.group(0), str(error)), self._offset + match.pos)
+            ctx.open_states.clear()
+            parse_function(*args)
+
+    def _section_error(self, match: re.Match, ctx: EclContext):
+        self._resync_to_section = True
+        self._handle_error(match, ctx)
+
+    def _section_start(self, match: re.Match, ctx: EclContext):
+        if ctx.pending_include is not None:
+            self._error(match.pos, match.group(0), self.INCLUDE_WITHOUT_TEXT)
+        try:
+            self._parse_line_start(match, ctx, self.lexer._parse_section_start, match, ctx)
+        except InternalError as error:
+            self._resync_to_section = True
+            self._error(match.pos, match.group(0), str(error))
+        ctx.open_state(OpenState.SECTION)
+        ctx.pos = match.end()
+
+    def _section_name_part(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_section_name_part(match, ctx)
+        if ctx.section_error_message:
+            if self.lexer.error_tracing_enabled:
+                self._error(match.pos, match.group(0), ctx.section_error_message)
+            self._error(match.start(1), match.group(1), ctx.section_error_message)
+        if match.group(3):
+            ctx.close_state()
+            ctx.stack.pop()
+        ctx.pos = match.end()
+
+    def _value_name(self, match: re.Match, ctx: EclContext):
+        if ctx.pending_include is not None:
+            self._error(match.pos, match.group(0), self.INCLUDE_WITHOUT_TEXT)
+        try:
+            self._parse_line_start(match, ctx, self.lexer._parse_value_name, match.group(0), ctx)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error) if self.is_validating else "")
+        ctx.pos = match.end()
+
+    def _value_on_next_line(self, match: re.Match, ctx: EclContext):
+        ctx.indent_pattern = match.group(0)
+        ctx.pos = match.end()
+
+    def _value(self, parse_function: Callable, match: re.Match, ctx: EclContext, *args):
+        try:
+            parse_function(match, ctx, *args)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error))
+        ctx.pos = match.end()
+
+    def _dec_value(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_integer_value, match, ctx, "dec", 19)
+
+    def _hex_value(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_integer_value, match, ctx, "hex", 16)
+
+    def _bin_value(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_integer_value, match, ctx, "bin", 64)
+
+    def _float_value(self, match: re.Match, ctx: EclContext):
+        try:
+            self.lexer._parse_float_value(match, ctx)
+        except InternalError:
+            self._handle_error(match, ctx)
+        ctx.pos = match.end()
+
+    def _bool_value(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_bool_value(match, ctx)
+        ctx.pos = match.end()
+
+    def _date_value(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_date_value, match, ctx)
+
+    def _byte_count(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_byte_count, match, ctx)
+
+    def _time_delta(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_time_delta, match, ctx)
+
+    def _text_start(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_text_start(ctx, OpenState.TEXT, ValueType.TEXT)
+        ctx.pos = match.end()
+
+    def _code_start(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_text_start(ctx, OpenState.CODE, ValueType.TEXT)
+        ctx.pos = match.end()
+
+    def _regex_start(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_text_start(ctx, OpenState.REGEX, ValueType.REGEX)
+        ctx.pos = match.end()
+
+    def _multi_line_text_start(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_text_start(ctx, OpenState.MULTILINE_TEXT, ValueType.TEXT)
+        ctx.pos = match.end()
+
+    def _multi_line_code_start(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_text_start(ctx, OpenState.MULTILINE_CODE, ValueType.TEXT)
+        ctx.pos = match.end()
+
+    def _multi_line_regex_start(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_text_start(ctx, OpenState.MULTILINE_REGEX, ValueType.REGEX)
+        ctx.pos = match.end()
+
+    def _text_char(self, match: re.Match, ctx: EclContext):
+        ctx.value_text_parts.append(match.group(0))
+        ctx.pos = match.end()
+
+    def _text_escape(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_text_escape, match, ctx)
+
+    def _text_end(self, match: re.Match, ctx: EclContext):
+        try:
+            self.lexer._parse_text_end(ctx)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error))
+        ctx.pos = match.end()
+        self.lexer._close_text(ctx)
+        if ctx.pending_include is not None:
+            self._include(match, ctx)
+
+    def _after_multi_line_start(self, match: re.Match, ctx: EclContext):
+        try:
+            self.lexer._parse_after_multi_line_start(match, ctx)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error))
+        ctx.pos = match.start(4) + len(ctx.indent_pattern)
+
+    def _multi_line_text(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_multi_line_text, match, ctx)
+
+    def _multi_line_spacing(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_multi_line_spacing, match, ctx)
+        ctx.pos = match.end(1)
+
+    def _multi_line_line_break(self, match: re.Match, ctx: EclContext):
+        try:
+            ctx.pos = self.lexer._parse_multi_line_line_break(match, ctx)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error))
+
+    def _multi_line_end(self, match: re.Match, ctx: EclContext):
+        try:
+            is_end = self.lexer._parse_multi_line_end(match, ctx)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error))
+        if not is_end:
+            indentation_group = 2 if len(match.groups()) == 3 else 4
+            ctx.pos = match.start(indentation_group) + len(ctx.indent_pattern)
+            return
+        ctx.pos = match.end()
+        self.lexer._close_text(ctx)
+        ctx.stack.pop()
+        if ctx.pending_include is not None:
+            self._include(match, ctx)
+
+    INCLUDE_WITHOUT_TEXT = "The @include meta command requires a text value."
+
+    def _include(self, match: re.Match, ctx: EclContext):
+        """Merge the documents of the pending `@include` command into the value tree."""
+        include = ctx.pending_include
+        ctx.pending_include = None
+        if include.type != ValueType.TEXT:
+            self._error(match.pos, match.group(0), self.INCLUDE_WITHOUT_TEXT)
+        resolver = self.lexer.include_resolver
+        directory = self.document_path.parent if self.document_path else Path.cwd()
+        try:
+            for path in resolver.resolve_paths(include.data, directory):
+                root, dependencies, depth = resolver.get_document(self, path)
+                self.dependencies.update(dependencies)
+                self.depth = max(self.depth, depth + 1)
+                self._merge_document(ctx.root, root)
+        except InternalError as error:
+            # The lexer never resolves includes, so there is no generic error to mirror. Always report the reason.
+            raise DocumentError(match.pos, match.group(0), str(error))
+        # An include closes the current section, and clears the last absolute section.
+        self.lexer.section_reset(ctx)
+        ctx.absolute_section = None
+
+    @staticmethod
+    def _merge_document(target_root: Value, source_root: Value):
+        """Merge an included document into the value tree, as if both were one document."""
+        # Each entry is a section of the value tree, and the section of the included document to merge into it.
+        stack = [(target_root, source_root)]
+        while stack:
+            target, source = stack.pop()
+            for value in source.iter_children():
+                if value.name.startswith("@"):
+                    continue  # Meta values only apply to their own document.
+                existing = target._children.get(value.name)
+                if existing is None:
+                    value._copy_to(target)
+                elif value.type == ValueType.SECTION_LIST and existing.type == ValueType.SECTION_LIST:
+                    for entry in value.iter_children():
+                        entry._copy_to(existing)
+                elif value.type.is_map() and existing.type.is_map():
+                    is_intermediate = existing.type == ValueType.INTERMEDIATE_SECTION
+                    if not is_intermediate and value.type != ValueType.INTERMEDIATE_SECTION:
+                        raise InternalError(f'The section "{".".join(existing.path)}" was already defined before.')
+                    if is_intermediate:
+                        existing.type = value.type
+                    stack.append((existing, value))
+                else:
+                    raise InternalError(f'The name "{".".join(existing.path)}" conflicts with an included value.')
+
+    def _byte_data_start(self, match: re.Match, ctx: EclContext):
+        self.lexer._parse_byte_data_start(match, ctx)
+        ctx.pos = match.end()
+
+    def _byte_data_byte(self, match: re.Match, ctx: EclContext):
+        self._value(self.lexer._parse_byte_data_byte, match, ctx)
+
+    def _byte_data_line_break(self, match: re.Match, ctx: EclContext):
+        try:
+            self.lexer._parse_byte_data_line_break(match, ctx)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error))
+        ctx.pos = self.lexer._byte_data_line_end(match, ctx)
+
+    def _byte_data_end(self, match: re.Match, ctx: EclContext):
+        try:
+            is_end = self.lexer._parse_byte_data_end(match, ctx)
+        except InternalError as error:
+            self._error(match.pos, match.group(0), str(error))
+        if not is_end:
+            ctx.pos = self.lexer._byte_data_line_end(match, ctx)
+            return
+        ctx.pos = match.end()
+        self.lexer._close_byte_data(ctx)
+
+    @staticmethod
+    def _compile_states(
+        states: dict[str, list[tuple[Optional[str], str, Optional[Callable], Any]]],
+    ) -> dict[str, tuple[dict[str, list], list]]:
+        """
+        Compile the rules of all states.
+
+        For each state, this creates a map from the first character to the rules that can match it, and a list
+        with the rules that have no known first character. The order of the rules is kept in both.
+        """
+        result = {}
+        for state_name, state_rules in states.items():
+            rules = []
+            for first_chars, regex, action, new_state in state_rules:
+                # Convert the state transition into the number of states to pop, and the states to push.
+                if new_state is None:
+                    new_state = ()
+                elif isinstance(new_state, str):
+                    new_state = ("#pop",) * int(new_state[5:] or 1) if new_state.startswith("#pop") else (new_state,)
+                pop_count = new_state.count("#pop")
+                new_states = new_state[pop_count:]
+                if "#pop" in new_states:
+                    raise InternalError(f"Unsupported state transition in state {state_name}: {new_state}")
+                rule_match = re.compile(regex, ErbslandConfigurationLanguage.flags).match
+                rules.append((first_chars, (rule_match, action, pop_count, new_states)))
+            all_first_chars = set("".join(first_chars for first_chars, _ in rules if first_chars))
+            rules_by_char = {
+                c: [rule for first_chars, rule in rules if first_chars is None or c in first_chars]
+                for c in all_first_chars
+            }
+            default_rules = [rule for first_chars, rule in rules if first_chars is None]
+            result[state_name] = (rules_by_char, default_rules)
+        return result
+
+    _TEXT_ESCAPE = [("\\", RE_TEXT_ESCAPE_SEQUENCE, _text_escape, None)]
+    _TEXT_PLACEHOLDER = [
+        ("$", RE_PLACEHOLDER_DOLLAR, _text_char, None),
+        ("$", RE_PLACEHOLDER_EMPTY, _handle_error, None),
+        ("$", RE_PLACEHOLDER, _text_char, None),
+        ("$", RE_PLACEHOLDER_OPEN, _handle_error, None),
+    ]
+    _MULTI_LINE_LINE_BREAK = [
+        ("\n\r", RE_MULTI_LINE_LINE_BREAK, _multi_line_line_break, None),
+        ("\n\r", RE_MULTI_LINE_EMPTY_LINE, _multi_line_line_break, None),
+    ]
+    _REGEX_ESCAPE = [("\\", RE_REGEX_ESCAPE, None, None)]
+    _REGEX_SPECIAL = [
+        ("-.^$*+?", RE_REGEX_OPERATOR, None, None),
+        ("#", r"#", None, None),
+        ("()[]{|}", RE_REGEX_PUNCTUATION, None, None),
+    ]
+    _REGEX_ANYTHING = [(None, RE_REGEX_CHARACTERS, None, None)]
+
+    STATES = _compile_states(
+        {
+            "root": [
+                (FIRST_END_OF_LINE, RE_END_OF_LINE, None, None),
+                ("-*[", RE_SECTION_ERROR, _section_error, "line_end"),
+                ("-*[", RE_SECTION_START, _section_start, ("line_end", "section_names")),
+                # The lexer only looks ahead here and matches the name in the "value_name" state.
+                ('@"' + FIRST_LETTERS, RE_VALUE_NAME, _value_name, ("value_after_name", "value_separator")),
+                (FIRST_CONTROL_CHARACTERS, RE_CONTROL_CHARACTERS, _handle_error, None),
+            ],
+            "section_names": [
+                (" \t", RE_SPACING, None, None),
+                ('"' + FIRST_LETTERS, RE_SECTION_NAME_PART, _section_name_part, None),
+            ],
+            "value_separator": [
+                (" \t:=", r"[ \t]*[:=]", None, "#pop"),
+                (" \t", RE_SPACING, None, None),
+            ],
+            "line_end": [
+                (FIRST_END_OF_LINE, RE_END_OF_LINE, None, "#pop"),
+            ],
+            "value_after_name": [
+                (FIRST_END_OF_LINE, RE_END_OF_LINE, None, ("#pop", "value_on_next_line")),
+                (None, r"[ \t]*", None, ("#pop", "comma_list", "single_value")),
+            ],
+            "value_on_next_line": [
+                (FIRST_END_OF_LINE, RE_END_OF_LINE, None, "#pop:2"),
+                (None, r"(?=[^ \t])", None, "#pop:2"),
+                (" \t", r"(?=[ \t]+\*)", None, ("#pop", "line_list")),
+                (" \t", r"[ \t]+(?!\*)", _value_on_next_line, ("#pop", "comma_list", "single_value")),
+            ],
+            "line_list": [
+                (" \t", r"([ \t]+)(\*)([ \t]*)", None, ("comma_list", "single_value")),
+                (None, r"(?=.)", None, "#pop"),
+            ],
+            "comma_list": [
+                (FIRST_END_OF_LINE, RE_END_OF_LINE, None, "#pop"),
+                (" \t,", RE_TRAILING_COMMA, _handle_trailing_comma, "#pop"),
+                (" \t,", RE_COMMA, None, ("#pop", "comma_list", "single_value")),
+            ],
+            "single_value": [
+                (",", r",", _handle_error, "#pop"),
+                ("tfyneodTFYNEOD", RE_BOOLEAN, _bool_value, "#pop"),
+                (FIRST_DIGITS + "tT", RE_DATE_TIME, _date_value, "#pop"),
+                ("+-iInN", RE_FLOAT_LITERAL, _float_value, "#pop"),
+                ("+-." + FIRST_DIGITS, RE_FLOAT, _float_value, "#pop"),
+                ("+-" + FIRST_DIGITS, RE_BYTE_COUNT, _byte_count, "#pop"),
+                ("+-" + FIRST_DIGITS, RE_TIME_DELTA, _time_delta, "#pop"),
+                ("+-" + FIRST_DIGITS, RE_HEX_INTEGER, _hex_value, "#pop"),
+                ("+-" + FIRST_DIGITS, RE_BIN_INTEGER, _bin_value, "#pop"),
+                ("+-" + FIRST_DIGITS, RE_DEC_INTEGER, _dec_value, "#pop"),
+                ('"', r'"""', _multi_line_text_start, ("#pop", "text_multi_line", "text_multi_line_after_start")),
+                ('"', r'"', _text_start, ("#pop", "text")),
+                (
+                    "`",
+                    RE_MULTI_LINE_CODE_START,
+                    _multi_line_code_start,
+                    ("#pop", "code_multi_line", "code_multi_line_after_start"),
+                ),
+                ("`", r"`", _code_start, ("#pop", "code")),
+                (
+                    "/",
+                    RE_MULTI_LINE_REGEX_START,
+                    _multi_line_regex_start,
+                    ("#pop", "regex_multi_line", "regex_multi_line_after_start"),
+                ),
+                ("/", r"/", _regex_start, ("#pop", "regex")),
+                (
+                    "<",
+                    RE_MULTI_LINE_BYTE_DATA_START,
+                    _byte_data_start,
+                    ("#pop", "byte_data_multi_line", "byte_data_after_start"),
+                ),
+                ("<", RE_BYTE_DATA_START, _byte_data_start, ("#pop", "byte_data")),
+            ],
+            "text": [
+                *_TEXT_ESCAPE,
+                ('"', r'"', _text_end, "#pop"),
+                *_TEXT_PLACEHOLDER,
+                (None, RE_TEXT_CHARACTERS, _text_char, None),
+            ],
+            "text_multi_line_after_start": [
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_EMPTY_FIRST_LINE, _multi_line_line_break, "#pop"),
+                (FIRST_END_OF_LINE, RE_END_OF_LINE + r'([ \t]+)(""")', _multi_line_end, "#pop"),
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_FIRST_LINE, _after_multi_line_start, "#pop"),
+            ],
+            "text_multi_line": [
+                ("\n\r", r'(\n|\r\n)([ \t]+)(""")', _multi_line_end, None),
+                *_MULTI_LINE_LINE_BREAK,
+                *_TEXT_ESCAPE,
+                *_TEXT_PLACEHOLDER,
+                (" \t", RE_MULTI_LINE_SPACING, _multi_line_spacing, None),
+                (None, RE_MULTI_LINE_TEXT_CHARACTERS, _multi_line_text, None),
+            ],
+            "code": [
+                ("`", r"`", _text_end, "#pop"),
+                (None, RE_CODE_CHARACTERS, _text_char, None),
+            ],
+            "code_multi_line_after_start": [
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_EMPTY_FIRST_LINE, _multi_line_line_break, "#pop"),
+                (FIRST_END_OF_LINE, RE_END_OF_LINE + r"([ \t]+)(```)", _multi_line_end, "#pop"),
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_FIRST_LINE, _after_multi_line_start, "#pop"),
+            ],
+            "code_multi_line": [
+                ("\n\r", r"(\n|\r\n)([ \t]+)(```)", _multi_line_end, None),
+                *_MULTI_LINE_LINE_BREAK,
+                (None, RE_MULTI_LINE_CODE_CHARACTERS, _text_char, None),
+            ],
+            "regex": [
+                *_REGEX_ESCAPE,
+                *_REGEX_SPECIAL,
+                ("/", r"/", _text_end, "#pop"),
+                *_REGEX_ANYTHING,
+            ],
+            "regex_multi_line_after_start": [
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_EMPTY_FIRST_LINE, _multi_line_line_break, "#pop"),
+                (FIRST_END_OF_LINE, RE_END_OF_LINE + r"([ \t]+)(///)", _multi_line_end, "#pop"),
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_FIRST_LINE, _after_multi_line_start, "#pop"),
+            ],
+            "regex_multi_line": [
+                ("\n\r", r"(\n|\r\n)([ \t]+)(///)", _multi_line_end, None),
+                ("/", r"/+", None, None),
+                *_MULTI_LINE_LINE_BREAK,
+                *_REGEX_ESCAPE,
+                ("#", RE_REGEX_COMMENT, None, None),
+                *_REGEX_SPECIAL,
+                *_REGEX_ANYTHING,
+            ],
+            "byte_data": [
+                (" \t", RE_SPACING, None, None),
+                ("abcdefABCDEF" + FIRST_DIGITS, RE_BYTE_DATA_BYTES, _byte_data_byte, None),
+                (">", r">", _byte_data_end, "#pop"),
+            ],
+            "byte_data_after_start": [
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_EMPTY_FIRST_LINE, _byte_data_line_break, "#pop"),
+                (FIRST_END_OF_LINE, RE_END_OF_LINE + r"([ \t]+)(>>>)", _byte_data_end, "#pop:2"),
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_FIRST_LINE, _byte_data_line_break, "#pop"),
+            ],
+            "byte_data_multi_line": [
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_EMPTY_FIRST_LINE, _byte_data_line_break, None),
+                (FIRST_END_OF_LINE, RE_END_OF_LINE + r"([ \t]+)(>>>)", _byte_data_end, "#pop"),
+                (FIRST_END_OF_LINE, RE_MULTI_LINE_FIRST_LINE, _byte_data_line_break, None),
+                (" \t", RE_SPACING, None, None),
+                ("abcdefABCDEF" + FIRST_DIGITS, RE_BYTE_DATA_BYTES, _byte_data_byte, None),
+            ],
+        }
+    )
+
+
+class IncludeResolver:
+    """
+    Resolves the `@include` meta commands of parsed documents.
+
+    Relative paths are resolved from the directory of the including document. A `*` wildcard is allowed in the
+    file name, and `**` as a directory name, to include all matching files below that directory. Matching files are
+    included in alphabetical order, files in the base directory first.
+
+    Every included document is parsed once, as a standalone document, and its value tree is kept until the
+    document or one of the documents it includes is modified. This way, documents that are shared between many
+    other documents are only parsed once for all of them.
+    """
+
+    MAX_NESTING_LEVEL = 5  # The main document is level one.
+    SOURCE_PREFIX = "file:"
+
+    def __init__(self, chunk_size: int = 0x100000):
+        """
+        :param chunk_size: The number of characters to read at once, when parsing an included document.
+        """
+        self.chunk_size = chunk_size
+        # The parsed documents by path, with the modification times of all their files and their nesting depth.
+        self._documents: dict[Path, tuple[Value, dict[Path, int], int]] = {}
+
+    def resolve_paths(self, source: str, directory: Path) -> list[Path]:
+        """
+        Resolve the source of an include into the paths of the documents to include.
+
+        :param source: The text of the `@include` command.
+        :param directory: The directory to resolve relative paths.
+        :raises: InternalError if the source is invalid, or a file without wildcard does not exist.
+        """
+        if source.startswith(self.SOURCE_PREFIX):
+            source = source[len(self.SOURCE_PREFIX) :]
+        if not source:
+            raise InternalError("The @include meta command requires a path.")
+        path = Path(source)
+        if not path.is_absolute():
+            path = directory / path
+        parts = path.parts
+        for part in parts[:-1]:
+            if "*" in part and part != "**":
+                raise InternalError('A "*" wildcard in a directory name must be a "**" directory.')
+        if "**" in parts[-1]:
+            raise InternalError('A "**" wildcard is not allowed in the file name.')
+        wildcard_index = next((index for index, part in enumerate(parts) if "*" in part), None)
+        if wildcard_index is None:
+            if not path.is_file():
+                raise InternalError(f'The included document "{source}" does not exist.')
+            return [path]
+        base = Path(*parts[:wildcard_index])
+        paths = [match for match in base.glob("/".join(parts[wildcard_index:])) if match.is_file()]
+        # Files in the base directory first, then files in subdirectories, each level in alphabetical order.
+        return sorted(paths, key=lambda match: (len(match.parts), match.parts))
+
+    def get_document(self, parser: "ValueTreeParser", path: Path) -> tuple[Value, dict[Path, int], int]:
+        """
+        Get the value tree of an included document, from the cache or by parsing the document.
+
+        :param parser: The parser of the including document.
+        :param path: The path of the included document.
+        :return: The root of the value tree, the modification times of all files of the document and the number
+            of nesting levels of the document.
+        :raises: InternalError if the document can't be included.
+        """
+        path = path.resolve()
+        if path in parser.include_stack:
+            raise InternalError(f'The document "{path}" includes itself.')
+        nesting_level = parser.nesting_level + 1
+        document = self._documents.get(path)
+        if document is None or not self._is_unmodified(document[1]):
+            document = self._parse_document(parser, path, nesting_level)
+            self._documents[path] = document
+        _, dependencies, depth = document
+        if any(dependency in parser.include_stack for dependency in dependencies):
+            raise InternalError(f'The document "{path}" includes itself.')
+        if nesting_level + depth - 1 > self.MAX_NESTING_LEVEL:
+            raise InternalError(f"Includes are limited to {self.MAX_NESTING_LEVEL} nested documents.")
+        return document
+
+    def _parse_document(
+        self, parser: "ValueTreeParser", path: Path, nesting_level: int
+    ) -> tuple[Value, dict[Path, int], int]:
+        if nesting_level > self.MAX_NESTING_LEVEL:
+            raise InternalError(f"Includes are limited to {self.MAX_NESTING_LEVEL} nested documents.")
+        document_parser = ValueTreeParser(parser.lexer, path, nesting_level, parser.include_stack)
+        document_parser.is_validating = True  # The message of the including document reports this error.
+        try:
+            modification_time = path.stat().st_mtime_ns  # Before reading, so a concurrent change is detected.
+            with path.open(encoding="utf-8") as file:
+                root = document_parser.parse_chunks(iter(functools.partial(file.read, self.chunk_size), ""))
+        except OSError as error:
+            raise InternalError(f'Could not read the included document "{path}": {error.strerror}')
+        except UnicodeDecodeError:
+            raise InternalError(f'The included document "{path}" is not valid UTF-8.')
+        except DocumentError as error:
+            raise InternalError(
+                f'Error in the included document "{path}" at line {error.line}, column {error.column}: {error.message}'
+            )
+        dependencies = {path: modification_time, **document_parser.dependencies}
+        return root, dependencies, document_parser.depth
+
+    @staticmethod
+    def _is_unmodified(dependencies: dict[Path, int]) -> bool:
+        try:
+            return all(path.stat().st_mtime_ns == modification_time for path, modification_time in dependencies.items())
+        except OSError:
+            return False
+
+
+class ValueTreeSerializer:
+    """
+    Serializes a value tree into a compact binary format and restores it.
+
+    The format starts with a table of all distinct names, followed by all values in pre-order. Each value is
+    stored with its type, the index of its name, the number of children and its tagged data. A tree is restored
+    by adding the values in their original order, so the restored tree has the same path index.
+    """
+
+    MAGIC = b"ELVT"
+    FORMAT_VERSION = 2
+
+    VALUE_TYPES = list(ValueType)
+    VALUE_TYPE_CODES = {value_type: code for code, value_type in enumerate(VALUE_TYPES)}
+
+    # Tags for the type of the data.
+    TAG_NONE = 0
+    TAG_FALSE = 1
+    TAG_TRUE = 2
+    TAG_INTEGER = 3
+    TAG_FLOAT = 4
+    TAG_TEXT = 5
+    TAG_BYTES = 6
+    TAG_DATE = 7
+    TAG_TIME = 8
+    TAG_DATETIME = 9
+    TAG_TIME_DELTA = 10
+    TAG_BIG_INTEGER = 11  # An integer outside the 64-bit range, stored as decimal text.
+    TAG_BIG_TIME_DELTA = 12  # A time delta with a count outside the 64-bit range.
+
+    HEADER = struct.Struct("<4sB")
+    VALUE = struct.Struct("<BBII")  # Type, data tag, name index, number of children.
+    LENGTH = struct.Struct("<I")
+    INTEGER = struct.Struct("<q")
+    INTEGER_MIN = -(2**63)
+    INTEGER_MAX = 2**63 - 1
+    FLOAT = struct.Struct("<d")
+
+    @classmethod
+    def dumps(cls, root: Value) -> bytes:
+        """Serialize the tree below the given root."""
+        names: dict[str, int] = {}
+        values = bytearray()
+        stack = [root]
+        while stack:
+            value = stack.pop()
+            if (name_index := names.get(value._name)) is None:
+                name_index = names[value._name] = len(names)
+            data = value.data
+            tag, payload = cls._encode_data(data)
+            values += cls.VALUE.pack(cls.VALUE_TYPE_CODES[value._type], tag, name_index, value.child_count)
+            values += payload
+            if value._children:
+                stack.extend(reversed(list(value.iter_children())))
+        result = bytearray(cls.HEADER.pack(cls.MAGIC, cls.FORMAT_VERSION))
+        result += cls.LENGTH.pack(len(names))
+        for name in names:
+            result += cls._encode_text(name)
+        result += values
+        return bytes(result)
+
+    @classmethod
+    def _encode_text(cls, text: str) -> bytes:
+        encoded = text.encode("utf-8", "surrogatepass")  # Escape sequences can produce surrogates.
+        return cls.LENGTH.pack(len(encoded)) + encoded
+
+    @classmethod
+    def _encode_data(cls, data: Any) -> tuple[int, bytes]:
+        data_type = type(data)
+        if data is None:
+            return cls.TAG_NONE, b""
+        if data_type is bool:
+            return (cls.TAG_TRUE if data else cls.TAG_FALSE), b""
+        if data_type is int:
+            if not cls.INTEGER_MIN <= data <= cls.INTEGER_MAX:
+                return cls.TAG_BIG_INTEGER, cls._encode_text(str(data))
+            return cls.TAG_INTEGER, cls.INTEGER.pack(data)
+        if data_type is float:
+            return cls.TAG_FLOAT, cls.FLOAT.pack(data)
+        if data_type is str:
+            return cls.TAG_TEXT, cls._encode_text(data)
+        if data_type is bytes:
+            return cls.TAG_BYTES, cls.LENGTH.pack(len(data)) + data
+        if data_type is datetime.date:
+            return cls.TAG_DATE, cls._encode_text(data.isoformat())
+        if data_type is datetime.time:
+            return cls.TAG_TIME, cls._encode_text(data.isoformat())
+        if data_type is datetime.datetime:
+            return cls.TAG_DATETIME, cls._encode_text(data.isoformat())
+        if data_type is tuple:
+            count, unit = data
+            if not cls.INTEGER_MIN <= count <= cls.INTEGER_MAX:
+                # The lexer does not limit the count of time deltas.
+                return cls.TAG_BIG_TIME_DELTA, cls._encode_text(str(count)) + cls._encode_text(unit)
+            return cls.TAG_TIME_DELTA, cls.INTEGER.pack(count) + cls._encode_text(unit)
+        raise InternalError(f"Cannot serialize data of type `{data_type.__name__}`.")
+
+    @classmethod
+    def loads(cls, data: bytes) -> Value:
+        """
+        Restore a tree that was serialized with `dumps`.
+
+        :raises: ValueError if the data is no valid serialized tree.
+        """
+        try:
+            magic, version = cls.HEADER.unpack_from(data, 0)
+            if magic != cls.MAGIC or version != cls.FORMAT_VERSION:
+                raise ValueError("Unknown format.")
+            pos = cls.HEADER.size
+            (name_count,) = cls.LENGTH.unpack_from(data, pos)
+            pos += cls.LENGTH.size
+            names: list[str] = []
+            for _ in range(name_count):
+                name, pos = cls._decode_text(data, pos)
+                names.append(name)
+            root, name, child_count, pos = cls._decode_value(data, pos, names)
+            root._name = name
+            # Each entry is a value and the number of its children that are not restored yet.
+            stack: list[list] = [[root, child_count]]
+            while stack:
+                entry = stack[-1]
+                if not entry[1]:
+                    stack.pop()
+                    continue
+                entry[1] -= 1
+                value, name, child_count, pos = cls._decode_value(data, pos, names)
+                value._attach(entry[0], name)
+                if child_count:
+                    stack.append([value, child_count])
+        except (struct.error, IndexError, UnicodeDecodeError, InternalError) as error:
+            raise ValueError(f"The serialized tree is corrupt: {error}")
+        if pos != len(data):
+            raise ValueError("The serialized tree is corrupt: Unexpected data at the end.")
+        return root
+
+    @classmethod
+    def _decode_bytes(cls, data: bytes, pos: int) -> tuple[bytes, int]:
+        (length,) = cls.LENGTH.unpack_from(data, pos)
+        pos += cls.LENGTH.size
+        end = pos + length
+        if end > len(data):
+            raise ValueError("The serialized tree is corrupt: The data is truncated.")
+        return data[pos:end], end
+
+    @classmethod
+    def _decode_text(cls, data: bytes, pos: int) -> tuple[str, int]:
+        encoded, pos = cls._decode_bytes(data, pos)
+        return encoded.decode("utf-8", "surrogatepass"), pos
+
+    @classmethod
+    def _decode_value(cls, data: bytes, pos: int, names: list[str]) -> tuple[Value, str, int, int]:
+        type_code, tag, name_index, child_count = cls.VALUE.unpack_from(data, pos)
+        pos += cls.VALUE.size
+        if tag == cls.TAG_NONE:
+            value_data = None
+        elif tag == cls.TAG_TEXT:
+            value_data, pos = cls._decode_text(data, pos)
+        elif tag == cls.TAG_INTEGER:
+            (value_data,) = cls.INTEGER.unpack_from(data, pos)
+            pos += cls.INTEGER.size
+        elif tag == cls.TAG_FALSE or tag == cls.TAG_TRUE:
+            value_data = tag == cls.TAG_TRUE
+        elif tag == cls.TAG_FLOAT:
+            (value_data,) = cls.FLOAT.unpack_from(data, pos)
+            pos += cls.FLOAT.size
+        elif tag == cls.TAG_BYTES:
+            value_data, pos = cls._decode_bytes(data, pos)
+        elif tag == cls.TAG_DATE:
+            text, pos = cls._decode_text(data, pos)
+            value_data = datetime.date.fromisoformat(text)
+        elif tag == cls.TAG_TIME:
+            text, pos = cls._decode_text(data, pos)
+            value_data = datetime.time.fromisoformat(text)
+        elif tag == cls.TAG_DATETIME:
+            text, pos = cls._decode_text(data, pos)
+            value_data = datetime.datetime.fromisoformat(text)
+        elif tag == cls.TAG_TIME_DELTA:
+            (count,) = cls.INTEGER.unpack_from(data, pos)
+            unit, pos = cls._decode_text(data, pos + cls.INTEGER.size)
+            value_data = (count, unit)
+        elif tag == cls.TAG_BIG_INTEGER:
+            text, pos = cls._decode_text(data, pos)
+            value_data = int(text)
+        elif tag == cls.TAG_BIG_TIME_DELTA:
+            text, pos = cls._decode_text(data, pos)
+            unit, pos = cls._decode_text(data, pos)
+            value_data = (int(text), unit)
+        else:
+            raise ValueError(f"The serialized tree is corrupt: Unknown data tag {tag}.")
+        # The value is added to its parent with `_attach`, as names are stored normalized.
+        return Value("", cls.VALUE_TYPES[type_code], None, value_data), names[name_index], child_count, pos
+
+
+@functools.cache
+def _lexer_source_hash() -> str:
+    """The hash of the lexer source, that invalidates all cached trees after a change."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+class ValueTreeCache:
+    """
+    An on-disk cache for the value trees of document files.
+
+    Each tree is stored in the format of `ValueTreeSerializer` in its own file. The file name is built from the
+    hash of the document, the source of the lexer and the lexer options, so neither a changed document nor a
+    changed lexer can load an outdated tree. Documents with errors are not cached.
+    """
+
+    def __init__(self, directory: Path, lexer: ErbslandConfigurationLanguage):
+        self.directory = directory
+        self.lexer = lexer
+
+    def _cache_path(self, path: Path) -> Path:
+        with path.open("rb") as file:
+            digest = hashlib.file_digest(file, "sha256")
+        digest.update(_lexer_source_hash().encode())
+        digest.update(f"{ValueTreeSerializer.FORMAT_VERSION}:{self.lexer.accept_all_signatures}".encode())
+        return self.directory / f"{digest.hexdigest()}.bin"
+
+    def get_value_tree(self, path: Path) -> Value:
+        """
+        Get the value tree for the given document file, from the cache or by parsing the file.
+
+        :raises: DocumentError if there was any error during parsing.
+        """
+        if self.lexer.include_resolver is not None:
+            # The cache only tracks the document itself, not the documents it includes.
+            return self.lexer.get_value_tree_from_file(path)
+        cache_path = self._cache_path(path)
+        try:
+            root = ValueTreeSerializer.loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            root = self.lexer.get_value_tree_from_file(path)
+            try:
+                data = ValueTreeSerializer.dumps(root)
+            except (InternalError, struct.error):
+                return root  # The cache is optional, never fail for a tree that was parsed.
+            self._write(cache_path, data)
+        return root
+
+    @staticmethod
+    def _write(cache_path: Path, data: bytes):
+        # Write a temporary file first, so parallel builds never read a partial file.
+        temporary_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_bytes(data)
+            temporary_path.replace(cache_path)
+        except OSError:
+            temporary_path.unlink(missing_ok=True)  # The cache is optional, parsing still works.
+
+
+class ValueTreeExporter:
+    """
+    Writes a value tree as JSON or as newline-delimited JSON records, while walking the tree.
+
+    Every value is written as object with its `type` and `value`, so the type of each value is preserved:
+    Bytes are written as hex text, dates and times in ISO 8601 format, time deltas as object with `count` and
+    `unit`, and floats that are not finite as the text `inf`, `-inf` or `nan`. In JSON documents, the value of
+    sections is an object with their children and the value of lists is an array.
+    """
+
+    def __init__(self, file: TextIO):
+        """
+        :param file: The text stream to write to.
+        """
+        self.file = file
+
+    @staticmethod
+    def encode_data(value: Value) -> str:
+        """Encode the data of a value that has no children as JSON."""
+        data = value.data
+        match value._type:
+            case ValueType.FLOAT if not math.isfinite(data):
+                return '"inf"' if data > 0 else ('"-inf"' if data < 0 else '"nan"')
+            case ValueType.BYTES:
+                return f'"{data.hex()}"'
+            case ValueType.DATE | ValueType.TIME | ValueType.DATETIME:
+                return f'"{data.isoformat()}"'
+            case ValueType.TIME_DELTA:
+                count, unit = data
+                return f'{{"count": {count}, "unit": {json.dumps(unit)}}}'
+        return json.dumps(data)
+
+    def write_json(self, root: Value):
+        """Write the tree below the given root as one JSON document."""
+        write = self.file.write
+        # Each entry is either a value or the literal text to write next.
+        stack: list[Union[Value, str]] = [root]
+        while stack:
+            item = stack.pop()
+            if type(item) is str:
+                write(item)
+                continue
+            write(f'{{"type": "{item._type.value}", "value": ')
+            if item._children is None:
+                write(self.encode_data(item))
+                write("}")
+                continue
+            is_map = isinstance(item._children, dict)
+            write("{" if is_map else "[")
+            stack.append("}}" if is_map else "]}")
+            children = list(item.iter_children())
+            for index in range(len(children) - 1, -1, -1):
+                stack.append(children[index])
+                separator = ", " if index else ""
+                if is_map:
+                    stack.append(f"{separator}{json.dumps(children[index]._name)}: ")
+                elif separator:
+                    stack.append(separator)
+        write("\n")
+
+    def write_ndjson(self, root: Value):
+        """
+        Write one JSON record per line, for all values below the given root, in document order.
+
+        Each record has the `path` of the value as array, with the indexes of list entries as integers, and the
+        `type` and `value` of the value. The value of sections and lists is `null`.
+        """
+        write = self.file.write
+        # Each entry is a value and its path.
+        stack: list[tuple[Value, list[Union[str, int]]]] = [
+            (child, [child._name]) for child in reversed(list(root.iter_children()))
+        ]
+        while stack:
+            value, path = stack.pop()
+            data = "null" if value._children is not None else self.encode_data(value)
+            write(f'{{"path": {json.dumps(path)}, "type": "{value._type.value}", "value": {data}}}\n')
+            if value._children:
+                if isinstance(value._children, dict):
+                    stack.extend((child, path + [child._name]) for child in reversed(value._children.values()))
+                else:
+                    stack.extend((child, path + [index]) for index, child in reversed(list(enumerate(value._children))))
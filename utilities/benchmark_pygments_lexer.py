@@ -0,0 +1,324 @@
+#  Copyright (c) 2025. Erbsland DEV. https://erbsland.dev
+#  SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark for the internal Pygments lexer, which is used for the syntax highlighting of all code examples in the
+documentation and for the `configuration-tree` directive.
+
+The tool generates synthetic ELCL documents with a chosen shape and size, times `get_tokens`,
+`get_tokens_unprocessed` and `get_value_tree` on them and writes the results as JSON, so runs before and after
+a change to the lexer can be compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+
+SHAPES = ["deep", "wide", "text", "bytes", "lists", "section-lists", "mixed"]
+METHODS = ["get_tokens", "get_tokens_unprocessed", "get_value_tree"]
+
+
+class DocumentGenerator:
+    """
+    Generates a synthetic ELCL document with a given shape.
+
+    Every shape repeats blocks of a specific structure until the document reaches the requested size. The same
+    seed always produces the same document.
+    """
+
+    WORDS = [
+        "alpha", "beta", "gamma", "delta", "server", "client", "filter", "value", "name", "port", "host", "user",
+        "path", "level", "limit", "timeout", "buffer", "channel", "entry", "option",
+    ]
+
+    def __init__(self, shape: str, size: int, seed: int = 1, depth: int = 8, width: int = 50) -> None:
+        self.shape = shape
+        self.size = size
+        self.depth = depth
+        self.width = width
+        self.random = random.Random(seed)
+        self.block_index = 0
+
+    def generate(self) -> str:
+        block_functions: dict[str, Callable[[], str]] = {
+            "deep": self._deep_block,
+            "wide": self._wide_block,
+            "text": self._text_block,
+            "bytes": self._bytes_block,
+            "lists": self._lists_block,
+            "section-lists": self._section_lists_block,
+            "mixed": self._mixed_block,
+        }
+        block_function = block_functions[self.shape]
+        parts: list[str] = ['@version: "1.0"\n']
+        length = len(parts[0])
+        while length < self.size:
+            block = block_function()
+            parts.append(block)
+            length += len(block)
+            self.block_index += 1
+        return "".join(parts)
+
+    def _word(self) -> str:
+        return self.random.choice(self.WORDS)
+
+    def _name(self, index: int) -> str:
+        return f"{self._word()}_{index}"
+
+    def _scalar_value(self) -> str:
+        kind = self.random.randrange(8)
+        if kind == 0:
+            return str(self.random.randrange(-100000, 100000))
+        if kind == 1:
+            return f"0x{self.random.randrange(0x10000):04x}"
+        if kind == 2:
+            return f"{self.random.uniform(-1000, 1000):.4f}"
+        if kind == 3:
+            return self.random.choice(["true", "false", "yes", "no", "enabled", "disabled"])
+        if kind == 4:
+            return f"2025-{self.random.randrange(1, 13):02}-{self.random.randrange(1, 29):02}"
+        if kind == 5:
+            return f"{self.random.randrange(1, 1000)} {self.random.choice(['kb', 'MiB', 'GB'])}"
+        if kind == 6:
+            return f"{self.random.randrange(1, 100)} {self.random.choice(['seconds', 'minutes', 'hours'])}"
+        return f'"{self._word()} {self._word()} {self._word()}"'
+
+    def _values(self, count: int) -> str:
+        return "".join(f"{self._name(index)}: {self._scalar_value()}\n" for index in range(count))
+
+    def _deep_block(self) -> str:
+        root = f"deep_{self.block_index}"
+        lines: list[str] = []
+        for level in range(1, self.depth + 1):
+            name = ".".join([root] + [f"level_{index}" for index in range(1, level)])
+            lines.append(f"[{name}]\n")
+            lines.append(self._values(2))
+        return "".join(lines)
+
+    def _wide_block(self) -> str:
+        return f"[wide_{self.block_index}]\n" + self._values(self.width)
+
+    def _text_block(self) -> str:
+        lines = [f"[text_{self.block_index}]\n"]
+        lines.append(f'single: "{" ".join(self._word() for _ in range(40))} \\t \\u{{1F600}} ${{name}}"\n')
+        lines.append('multi line: """\n')
+        for _ in range(self.width):
+            lines.append("    " + " ".join(self._word() for _ in range(12)) + "\n")
+        lines.append('    """\n')
+        lines.append("code: ```\n")
+        for index in range(self.width // 2):
+            lines.append(f"    call_{index}({self._word()}, {self.random.randrange(100)});\n")
+        lines.append("    ```\n")
+        return "".join(lines)
+
+    def _bytes_block(self) -> str:
+        lines = [f"[bytes_{self.block_index}]\n", "single: <", self.random.randbytes(32).hex(" "), ">\n"]
+        lines.append("data: <<<hex\n")
+        for _ in range(self.width):
+            lines.append("    " + self.random.randbytes(32).hex(" ", 4) + "\n")
+        lines.append("    >>>\n")
+        return "".join(lines)
+
+    def _lists_block(self) -> str:
+        lines = [f"[lists_{self.block_index}]\n"]
+        for index in range(self.width // 5):
+            lines.append(f"{self._name(index)}: {', '.join(self._scalar_value() for _ in range(8))}\n")
+        lines.append("multi line list:\n")
+        for _ in range(self.width // 5):
+            lines.append(f"    * {', '.join(self._scalar_value() for _ in range(4))}\n")
+        return "".join(lines)
+
+    def _section_lists_block(self) -> str:
+        lines: list[str] = []
+        for _ in range(self.width // 5):
+            lines.append(f"*[entries_{self.block_index}]*\n")
+            lines.append(self._values(4))
+        return "".join(lines)
+
+    def _mixed_block(self) -> str:
+        shape_functions = [
+            self._deep_block,
+            self._wide_block,
+            self._text_block,
+            self._bytes_block,
+            self._lists_block,
+            self._section_lists_block,
+        ]
+        return shape_functions[self.block_index % len(shape_functions)]()
+
+
+class Benchmark:
+    """
+    Times the lexer methods on generated documents and collects the results.
+    """
+
+    def __init__(self) -> None:
+        self.args: argparse.Namespace | None = None
+        self.results: list[dict] = []
+        self._initialize_lexer()
+
+    def _initialize_lexer(self) -> None:
+        doc_path = Path(__file__).parent.parent / "doc" / "_ext"
+        if not doc_path.is_dir():
+            exit(f"Missing `doc` directory: {doc_path}")
+        sys.path.append(str(doc_path))
+        from pygments_elcl import ErbslandConfigurationLanguage
+
+        self.lexer = ErbslandConfigurationLanguage()
+
+    def run(self) -> None:
+        self.parse_command_line()
+        for shape in self.args.shape:
+            generator = DocumentGenerator(
+                shape, self.args.size * 1024, seed=self.args.seed, depth=self.args.depth, width=self.args.width
+            )
+            text = generator.generate()
+            if self.args.write_documents:
+                self.args.write_documents.mkdir(parents=True, exist_ok=True)
+                (self.args.write_documents / f"benchmark-{shape}.elcl").write_text(text, encoding="utf-8")
+            self.benchmark_document(shape, text)
+        self.write_results()
+
+    def parse_command_line(self) -> None:
+        parser = argparse.ArgumentParser(
+            description="Benchmark the internal pygments lexer, using generated documents with different shapes."
+        )
+        parser.add_argument(
+            "-s",
+            "--shape",
+            action="append",
+            choices=SHAPES,
+            help="Shape of the generated document. Can be used multiple times. Default: all shapes.",
+        )
+        parser.add_argument(
+            "-m",
+            "--method",
+            action="append",
+            choices=METHODS,
+            help="Lexer method to benchmark. Can be used multiple times. Default: all methods.",
+        )
+        parser.add_argument("--size", type=int, default=256, metavar="<KiB>", help="Document size in KiB.")
+        parser.add_argument("--depth", type=int, default=8, help="Section depth for the `deep` shape.")
+        parser.add_argument("--width", type=int, default=50, help="Values or lines per block.")
+        parser.add_argument("--seed", type=int, default=1, help="Seed for the document generator.")
+        parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of timed runs per method.")
+        parser.add_argument(
+            "-o", "--output", type=Path, metavar="<file>", help="Write the results as JSON into this file."
+        )
+        parser.add_argument(
+            "--write-documents", type=Path, metavar="<dir>", help="Write the generated documents into this directory."
+        )
+        parser.add_argument("--no-memory", action="store_true", help="Skip measuring the peak memory usage.")
+        self.args = parser.parse_args()
+        if not self.args.shape:
+            self.args.shape = SHAPES
+        if not self.args.method:
+            self.args.method = METHODS
+        if self.args.repeat < 1:
+            exit("The number of runs must be at least one.")
+
+    def _method_function(self, method: str) -> Callable[[str], int]:
+        """Return a function that runs the method on a text and returns the number of produced tokens or values."""
+        if method == "get_tokens":
+            return lambda text: sum(1 for _ in self.lexer.get_tokens(text))
+        if method == "get_tokens_unprocessed":
+            return lambda text: sum(1 for _ in self.lexer.get_tokens_unprocessed(text))
+        return lambda text: sum(1 for _ in self.lexer.get_value_tree(text).all_values())
+
+    def benchmark_document(self, shape: str, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        print(f"Shape {shape}: {size / 1024:.1f} KiB, {text.count(chr(10))} lines")
+        for method in self.args.method:
+            function = self._method_function(method)
+            timings: list[float] = []
+            count = 0
+            for _ in range(self.args.repeat):
+                start = time.perf_counter()
+                count = function(text)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            result = {
+                "shape": shape,
+                "method": method,
+                "bytes": size,
+                "count": count,
+                "count_unit": "values" if method == "get_value_tree" else "tokens",
+                "runs": len(timings),
+                "best_seconds": best,
+                "median_seconds": statistics.median(timings),
+                "items_per_second": count / best if best else None,
+                "mb_per_second": size / best / 1_000_000 if best else None,
+                "peak_memory_bytes": None if self.args.no_memory else self._measure_peak_memory(function, text),
+            }
+            self.results.append(result)
+            self._print_result(result)
+
+    @staticmethod
+    def _measure_peak_memory(function: Callable[[str], int], text: str) -> int:
+        tracemalloc.start()
+        try:
+            function(text)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak
+
+    @staticmethod
+    def _print_result(result: dict) -> None:
+        line = (
+            f"    {result['method']:24} {result['best_seconds'] * 1000:9.2f} ms"
+            f" {result['items_per_second']:12.0f} {result['count_unit']}/s"
+            f" {result['mb_per_second']:7.2f} MB/s"
+        )
+        if result["peak_memory_bytes"] is not None:
+            line += f" {result['peak_memory_bytes'] / 1024 / 1024:8.1f} MiB peak"
+        print(line)
+
+    def _environment(self) -> dict:
+        import pygments
+
+        return {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "pygments": pygments.__version__,
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    def write_results(self) -> None:
+        if not self.args.output:
+            return
+        document = {
+            "environment": self._environment(),
+            "settings": {
+                "size_kib": self.args.size,
+                "depth": self.args.depth,
+                "width": self.args.width,
+                "seed": self.args.seed,
+                "repeat": self.args.repeat,
+            },
+            "results": self.results,
+        }
+        self.args.output.parent.mkdir(parents=True, exist_ok=True)
+        self.args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+        print(f"Results written to: {self.args.output}")
+
+
+def main() -> None:
+    benchmark = Benchmark()
+    benchmark.run()
+
+
+if __name__ == "__main__":
+    main()
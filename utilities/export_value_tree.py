@@ -0,0 +1,90 @@
+#  Copyright (c) 2025. Erbsland DEV. https://erbsland.dev
+#  SPDX-License-Identifier: Apache-2.0
+
+"""
+Exports the value tree of ELCL documents, as parsed by the internal Pygments lexer, as JSON or as
+newline-delimited JSON records.
+
+The records are written while the tree is walked, so large documents are never converted into an
+intermediate structure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import TextIO
+
+
+FORMATS = ["json", "ndjson"]
+
+
+class Exporter:
+    """
+    Parses the given documents and writes their value trees.
+    """
+
+    def __init__(self) -> None:
+        self.args: argparse.Namespace | None = None
+        self._initialize_lexer()
+
+    def _initialize_lexer(self) -> None:
+        doc_path = Path(__file__).parent.parent / "doc" / "_ext"
+        if not doc_path.is_dir():
+            exit(f"Missing `doc` directory: {doc_path}")
+        sys.path.append(str(doc_path))
+        from pygments_elcl import ErbslandConfigurationLanguage, DocumentError, ValueTreeExporter
+
+        self.DocumentError = DocumentError
+        self.ValueTreeExporter = ValueTreeExporter
+        self.lexer = ErbslandConfigurationLanguage(accept_all_signatures=False)
+
+    def run(self) -> None:
+        self.parse_command_line()
+        if self.args.output:
+            with self.args.output.open("w", encoding="utf-8") as file:
+                self.export_documents(file)
+        else:
+            self.export_documents(sys.stdout)
+
+    def parse_command_line(self) -> None:
+        parser = argparse.ArgumentParser(
+            description="Export the value tree of ELCL documents, parsed by the internal pygments lexer, as JSON."
+        )
+        parser.add_argument("documents", nargs="+", type=Path, metavar="<file>", help="The documents to export.")
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=FORMATS,
+            default="ndjson",
+            help="Write one JSON document per input, or one JSON record per value. Default: ndjson",
+        )
+        parser.add_argument(
+            "-o", "--output", type=Path, metavar="<file>", help="Write into this file instead of standard output."
+        )
+        self.args = parser.parse_args()
+        for path in self.args.documents:
+            if not path.is_file():
+                exit(f"Document not found: {path}")
+
+    def export_documents(self, file: TextIO) -> None:
+        exporter = self.ValueTreeExporter(file)
+        for path in self.args.documents:
+            try:
+                root = self.lexer.get_value_tree_from_file(path)
+            except self.DocumentError as error:
+                exit(f"Failed to parse {path}, at position {error.pos}: {error.message}")
+            if self.args.format == "json":
+                exporter.write_json(root)
+            else:
+                exporter.write_ndjson(root)
+
+
+def main() -> None:
+    exporter = Exporter()
+    exporter.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,74 +8,333 @@ Utility to build Sphinx documentation, convert HTML to compact Markdown, and gen
 from __future__ import annotations
 
 import argparse
+import hashlib
+import html
 import json
-import re
-import subprocess
+import os
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import html2text
 
-def build_html(source_dir: Path | str, build_dir: Path | str) -> None:
-    """Build Sphinx documentation into HTML."""
+def build_html(
+    source_dir: Path | str,
+    build_dir: Path | str,
+    doctree_dir: Path | str | None = None,
+    jobs: int | str = "auto",
+    force: bool = False,
+) -> set[Path]:
+    """
+    Build Sphinx documentation into HTML.
+
+    The environment and doctrees are kept in `doctree_dir` between runs, so Sphinx only reads and writes the
+    documents that changed.
+
+    :param doctree_dir: The directory for the environment and doctrees. Default is `.doctrees` in the build
+        directory.
+    :param jobs: The number of parallel Sphinx processes, or `auto` for one per CPU.
+    :param force: Read and write all documents.
+    :return: The paths of all HTML pages that were written by this build, relative to the build directory.
+    """
+    from sphinx.application import Sphinx
+    from sphinx.util.parallel import parallel_available
+
     src = Path(source_dir)
     out = Path(build_dir)
     out.mkdir(parents=True, exist_ok=True)
-    cmd = ["sphinx-build", str(src), str(out)]
-    subprocess.run(cmd, check=True)
-
-def convert_html_to_markdown(html_dir: Path | str, md_dir: Path | str) -> None:
-    """Convert HTML files to compact Markdown using html2text."""
-    converter = html2text.HTML2Text()
-    # Simplify output by removing images and links, and avoid internal link markers
-    converter.ignore_images = True
-    converter.ignore_links = True
-    converter.skip_internal_links = True
-    converter.body_width = 0
+    doctrees = Path(doctree_dir) if doctree_dir else out / ".doctrees"
+    if jobs == "auto":
+        jobs = os.cpu_count() or 1
+    app = Sphinx(
+        str(src),
+        str(src),
+        str(out),
+        str(doctrees),
+        "html",
+        freshenv=force,
+        parallel=int(jobs) if parallel_available else 1,
+    )
+    # Documents are resolved in the main process before they are written, also in parallel builds. Additional
+    # pages, like the index, are always rendered in the main process.
+    written_pages: set[str] = set()
+    app.connect("doctree-resolved", lambda _app, _doctree, docname: written_pages.add(docname))
+    app.connect("html-page-context", lambda _app, pagename, *_args: written_pages.add(pagename))
+    app.build(force_all=force)
+    if app.statuscode:
+        raise RuntimeError(f"Sphinx build failed with status {app.statuscode}.")
+    return {Path(app.builder.get_outfilename(page)).relative_to(app.outdir) for page in written_pages}
 
-    html_root = Path(html_dir)
-    md_root = Path(md_dir)
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
 
-    for html_path in html_root.rglob("*.html"):
-        rel_path = html_path.relative_to(html_root)
-        md_path = md_root / rel_path.with_suffix(".md")
-        md_path.parent.mkdir(parents=True, exist_ok=True)
-        html = html_path.read_text(encoding="utf-8")
-        # strip the sidebar navigation (built-in TOC), page-level TOC block, and footer
-        html = re.sub(r'<nav[^>]*wy-nav-side[^>]*>[\s\S]*?</nav>', '', html, flags=re.I)
-        html = re.sub(r'<section id="table-of-contents">[\s\S]*?</section>', '', html, flags=re.I)
-        html = re.sub(r'<div class="toctree-wrapper compound">[\s\S]*?</div>', '', html, flags=re.I)
-        html = re.sub(r'<footer[\s\S]*?</footer>', '', html, flags=re.I)
-        # remove everything before the main header to start document at the title
-        html = re.sub(r'^[\s\S]*?(<h1[^>]*>)', r"\1", html, flags=re.I)
-        md = converter.handle(html)
+class StructureStripper(HTMLParser):
+    """
+    Strip the page structure around the actual content in a single pass.
+
+    Drops the sidebar navigation (built-in TOC), the page-level TOC block, toctree wrappers and the footer as whole
+    subtrees, and starts the document at the main header. Everything else is passed through unchanged. On the way,
+    the headings of the content are collected as outline, with their level, title and anchor.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self.parts: list[str] = []
+        self.title_index: int | None = None  # index of the first `<h1>` in `parts`
+        self.drop_tag: str | None = None  # the tag name of the subtree that is dropped
+        self.drop_depth = 0  # nesting level of `drop_tag` inside the dropped subtree
+        self.outline: list[dict] = []  # the headings, starting with the main header
+        self.heading: dict | None = None  # the heading that is currently read
+        self.heading_text: list[str] = []
+        self.in_headerlink = False  # if the parser is in the permalink of a heading
+
+    @staticmethod
+    def _is_dropped(tag: str, attributes: dict[str, str]) -> bool:
+        if tag == "footer":
+            return True
+        if tag == "nav":
+            return any("wy-nav-side" in value for value in attributes.values())
+        if tag == "section":
+            return attributes.get("id") == "table-of-contents"
+        if tag == "div":
+            return "toctree-wrapper" in attributes.get("class", "").split()
+        return False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.drop_tag is not None:
+            if tag == self.drop_tag:
+                self.drop_depth += 1
+            return
+        attributes = {name: value or "" for name, value in attrs}
+        if self._is_dropped(tag, attributes):
+            self.drop_tag = tag
+            self.drop_depth = 1
+            return
+        if tag == "h1" and self.title_index is None:
+            self.title_index = len(self.parts)
+        if tag in HEADING_TAGS and self.title_index is not None:
+            self.heading = {"level": int(tag[1]), "title": "", "anchor": ""}
+            self.heading_text = []
+        elif tag == "a" and self.heading is not None and "headerlink" in attributes.get("class", "").split():
+            self.heading["anchor"] = attributes.get("href", "").lstrip("#")
+            self.in_headerlink = True
+        self.parts.append(self.get_starttag_text())
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.drop_tag is None:
+            self.parts.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.drop_tag is not None:
+            if tag == self.drop_tag:
+                self.drop_depth -= 1
+                if self.drop_depth == 0:
+                    self.drop_tag = None
+            return
+        if tag == "a":
+            self.in_headerlink = False
+        elif tag in HEADING_TAGS and self.heading is not None:
+            self.heading["title"] = " ".join("".join(self.heading_text).split())
+            self.outline.append(self.heading)
+            self.heading = None
+        self.parts.append(f"</{tag}>")
+
+    def _add_heading_text(self, text: str) -> None:
+        if self.heading is not None and not self.in_headerlink:
+            self.heading_text.append(text)
+
+    def handle_data(self, data: str) -> None:
+        if self.drop_tag is None:
+            self._add_heading_text(data)
+            self.parts.append(data)
+
+    def handle_entityref(self, name: str) -> None:
+        if self.drop_tag is None:
+            self._add_heading_text(html.unescape(f"&{name};"))
+            self.parts.append(f"&{name};")
+
+    def handle_charref(self, name: str) -> None:
+        if self.drop_tag is None:
+            self._add_heading_text(html.unescape(f"&#{name};"))
+            self.parts.append(f"&#{name};")
+
+    def strip(self, html: str) -> str:
+        """Return the stripped HTML fragment, starting at the main header if there is one."""
+        self.feed(html)
+        self.close()
+        return "".join(self.parts[self.title_index or 0 :])
+
+MANIFEST_NAME = ".manifest.json"
+
+_converter: html2text.HTML2Text | None = None
+
+def _get_converter() -> html2text.HTML2Text:
+    """Get the converter for this process."""
+    global _converter
+    if _converter is None:
+        _converter = html2text.HTML2Text()
+        # Simplify output by removing images and links, and avoid internal link markers
+        _converter.ignore_images = True
+        _converter.ignore_links = True
+        _converter.skip_internal_links = True
+        _converter.body_width = 0
+    return _converter
+
+def convert_html_file(html_path: Path, md_path: Path) -> dict:
+    """
+    Convert a single HTML file to compact Markdown.
+
+    :return: The index record for the page, with the title, the outline of all headings and the size of the
+        Markdown file in bytes.
+    """
+    md_path.parent.mkdir(parents=True, exist_ok=True)
+    stripper = StructureStripper()
+    html = stripper.strip(html_path.read_text(encoding="utf-8"))
+    md = _get_converter().handle(html)
+    with md_path.open("w", encoding="utf-8") as file:
+        file.writelines(compact_markdown(iter_lines(md)))
+    outline = stripper.outline
+    title = outline[0]["title"] if outline else md_path.name
+    return {"title": title, "outline": outline, "size": md_path.stat().st_size}
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Iterate over the lines of a text, without the line breaks and without building a list of lines."""
+    start = 0
+    while (end := text.find("\n", start)) != -1:
+        yield text[start:end]
+        start = end + 1
+    if start < len(text):
+        yield text[start:]
+
+def compact_markdown(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Post-process Markdown lines and yield the compact output in chunks.
+
+    Removes the anchor icons from link markers and trailing whitespace, and squeezes consecutive blank lines into
+    one. Lines are separated by a line break, with no line break after the last line.
+    """
+    blank = False
+    first = True
+    for line in lines:
         # remove unwanted anchor icons from link markers
-        md = md.replace('\uf0c1', '')
+        line = line.replace('\uf0c1', '').rstrip()
         # remove consecutive blank lines
-        lines = [line.rstrip() for line in md.splitlines()]
-        cleaned = []
-        blank = False
-        for line in lines:
-            if not line:
-                if not blank:
-                    cleaned.append(line)
-                blank = True
-            else:
-                cleaned.append(line)
-                blank = False
-        md_path.write_text("\n".join(cleaned), encoding="utf-8")
-
-def generate_index(md_dir: Path | str, index_file: Path | str) -> None:
-    """Generate a JSON index mapping document titles to Markdown paths."""
-    index: list[dict[str, str]] = []
+        if not line:
+            if blank:
+                continue
+            blank = True
+        else:
+            blank = False
+        if first:
+            first = False
+            yield line
+        else:
+            yield "\n" + line
+
+def _convert_html_file_task(paths: tuple[Path, Path]) -> dict:
+    return convert_html_file(*paths)
+
+def _read_manifest(manifest_path: Path) -> dict:
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if isinstance(manifest, dict) and isinstance(manifest.get("pages"), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"converter": "", "pages": {}}
+
+def _remove_stale_file(md_root: Path, md_path: Path) -> None:
+    """Remove a stale Markdown file and any directories that became empty."""
+    md_path.unlink(missing_ok=True)
+    directory = md_path.parent
+    while directory != md_root and directory.is_dir() and not any(directory.iterdir()):
+        directory.rmdir()
+        directory = directory.parent
+
+def convert_html_to_markdown(
+    html_dir: Path | str,
+    md_dir: Path | str,
+    jobs: int = 0,
+    force: bool = False,
+    changed_pages: Iterable[Path] | None = None,
+) -> list[dict]:
+    """
+    Convert HTML files to compact Markdown using html2text.
+
+    Only pages whose HTML changed since the last run are converted, using a manifest with the hash and the index
+    record of each page in the Markdown directory. Markdown files of pages that no longer exist are removed.
+
+    :param jobs: The number of worker processes, or 0 for one process per CPU.
+    :param force: Convert all pages, even if they didn't change.
+    :param changed_pages: If set, only these pages (relative to `html_dir`) are checked for changes, all other
+        pages are expected to be unchanged since the last run.
+    :return: The index records of all pages, sorted by path. Records of unchanged pages are taken from the
+        manifest.
+    """
+    html_root = Path(html_dir)
     md_root = Path(md_dir)
-    for md_path in md_root.rglob("*.md"):
-        rel_path = md_path.relative_to(md_root)
-        title = md_path.name
-        for line in md_path.read_text(encoding="utf-8").splitlines():
-            if line.startswith("#"):
-                title = line.lstrip("# ").strip()
-                break
-        index.append({"title": title, "path": str(rel_path)})
+    manifest_path = md_root / MANIFEST_NAME
+    # Any change in this script invalidates all converted pages.
+    converter_hash = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+    manifest = _read_manifest(manifest_path)
+    if force or manifest["converter"] != converter_hash:
+        old_pages = {}
+    else:
+        old_pages = manifest["pages"]
+
+    changed = {path.as_posix() for path in changed_pages} if changed_pages is not None else None
+    pages: dict[str, dict] = {}
+    tasks: list[tuple[Path, Path]] = []
+    task_pages: list[dict] = []
+    for html_path in sorted(html_root.rglob("*.html")):
+        rel_path = html_path.relative_to(html_root)
+        md_rel_path = rel_path.with_suffix(".md")
+        md_path = md_root / md_rel_path
+        old_page = old_pages.get(rel_path.as_posix())
+        if changed is not None and rel_path.as_posix() not in changed and old_page and md_path.is_file():
+            pages[rel_path.as_posix()] = old_page
+            continue
+        html_hash = hashlib.sha256(html_path.read_bytes()).hexdigest()
+        page = {"hash": html_hash, "md": md_rel_path.as_posix()}
+        if old_page and old_page["hash"] == html_hash and old_page["md"] == page["md"] and md_path.is_file():
+            pages[rel_path.as_posix()] = old_page
+            continue
+        pages[rel_path.as_posix()] = page
+        tasks.append((html_path, md_path))
+        task_pages.append(page)
+
+    workers = min(jobs or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_size = max(1, len(tasks) // (workers * 4))
+            records = list(executor.map(_convert_html_file_task, tasks, chunksize=chunk_size))
+    else:
+        records = [_convert_html_file_task(task) for task in tasks]
+    for page, record in zip(task_pages, records):
+        page.update(record)
+
+    # remove the Markdown files of deleted pages
+    current_md_paths = {page["md"] for page in pages.values()}
+    for page in manifest["pages"].values():
+        if page.get("md") and page["md"] not in current_md_paths:
+            _remove_stale_file(md_root, md_root / page["md"])
+
+    md_root.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps({"converter": converter_hash, "pages": pages}, indent=2), encoding="utf-8")
+    print(f"Converted {len(tasks)} of {len(pages)} pages.")
+    return [
+        {"title": page["title"], "path": page["md"], "size": page["size"], "outline": page["outline"]}
+        for page in sorted(pages.values(), key=lambda page: page["md"])
+    ]
+
+def generate_index(records: Iterable[dict], index_file: Path | str) -> None:
+    """
+    Generate a JSON index mapping document titles to Markdown paths.
+
+    Each entry also contains the size of the Markdown file in bytes and the outline with the level, title and
+    anchor of every heading.
+    """
+    index = list(records)
     index_path = Path(index_file)
     index_path.parent.mkdir(parents=True, exist_ok=True)
     index_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
@@ -87,6 +346,10 @@ def main():
     parser.add_argument("--md-dir", "-m", default="docs_md", help="Output Markdown directory")
     parser.add_argument("--index-file", "-i", default="docs_md/index.json", help="Output index file")
     parser.add_argument("--no-build", action="store_true", help="Skip building HTML documentation")
+    parser.add_argument("--doctree-dir", "-d", default="build/doctrees", help="Persistent Sphinx doctree directory")
+    parser.add_argument("--sphinx-jobs", default="auto", help="Parallel Sphinx processes, or 'auto' for one per CPU")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Conversion processes, 0 for one per CPU")
+    parser.add_argument("--force", action="store_true", help="Rebuild and convert all pages, even unchanged ones")
     args = parser.parse_args()
 
     source = Path(args.source)
@@ -94,13 +357,16 @@ def main():
     md_dir = Path(args.md_dir)
     index_file = Path(args.index_file)
 
+    changed_pages = None
     if not args.no_build:
         print(f"Building HTML documentation: {source} -> {build_dir}")
-        build_html(source, build_dir)
+        changed_pages = build_html(source, build_dir, args.doctree_dir, jobs=args.sphinx_jobs, force=args.force)
     print(f"Converting HTML to Markdown: {build_dir} -> {md_dir}")
-    convert_html_to_markdown(build_dir, md_dir)
+    records = convert_html_to_markdown(
+        build_dir, md_dir, jobs=args.jobs, force=args.force, changed_pages=changed_pages
+    )
     print(f"Generating index file: {index_file}")
-    generate_index(md_dir, index_file)
+    generate_index(records, index_file)
     print("Done.")
 
 if __name__ == "__main__":
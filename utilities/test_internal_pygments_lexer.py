@@ -7,7 +7,11 @@ examples in the documentation. It uses the test files from the `tests` directory
 any errors in a document correctly. The output files aren't used for these tests.
 """
 import argparse
+import hashlib
+import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import traceback
 import sys
@@ -23,6 +27,36 @@ class TestOutcome(StrEnum):
     READ = "READ"
 
 
+def parse_test_file(lexer: "ErbslandConfigurationLanguage", path: Path) -> TestOutcome:
+    """Parse a single test file and return the outcome. A document passes if the tokens and the value tree pass."""
+    try:
+        tokens = list(lexer.get_tokens(path.read_text()))
+        for token, text in tokens:
+            if token is Error or token is None or not isinstance(text, str):
+                raise ValueError("Invalid syntax")
+        # The tokens cover the text after the input preprocessing of the lexer, so both see the same document.
+        lexer.get_value_tree("".join(text for _, text in tokens))
+        return TestOutcome.PASS
+    except Exception:
+        return TestOutcome.FAIL
+
+
+_worker_lexer: Optional["ErbslandConfigurationLanguage"] = None  # The lexer instance of a worker process.
+
+
+def _initialize_worker(doc_path: str) -> None:
+    global _worker_lexer
+    if doc_path not in sys.path:
+        sys.path.append(doc_path)
+    from pygments_elcl import ErbslandConfigurationLanguage
+
+    _worker_lexer = ErbslandConfigurationLanguage(accept_all_signatures=False)
+
+
+def _parse_test_file_in_worker(path: Path) -> TestOutcome:
+    return parse_test_file(_worker_lexer, path)
+
+
 class WorkingSet:
 
     RE_CHARACTERS_TO_ESCAPE = re.compile(r"[\\\"\x00-\x1F\x7F-\x9F]")
@@ -32,6 +66,8 @@ class WorkingSet:
             rf"^(\d{{4}})-({'|'.join(outcome for outcome in TestOutcome)})-(.*).elcl$"
         )
         self.test_files: List[Path] = []
+        self.jobs: int = 1
+        self.use_cache: bool = True
         self._initialize_paths()
         self._initialize_lexer()
 
@@ -42,12 +78,14 @@ class WorkingSet:
         self.test_data: Path = Path(__file__).parent.parent / "tests" / "V1_0"
         if not self.test_data.is_dir():
             exit(f"Missing `tests` directory: {self.test_data}")
+        self.cache_path: Path = Path(__file__).parent.parent / ".cache" / "test_internal_pygments_lexer.json"
         sys.path.append(str(self.doc_path))
 
     def _initialize_lexer(self) -> None:
-        from pygments_elcl import ErbslandConfigurationLanguage, InternalError, DocumentError
+        from pygments_elcl import ErbslandConfigurationLanguage, EclContext, InternalError, DocumentError
 
         self.ErbslandConfigurationLanguage = ErbslandConfigurationLanguage
+        self.EclContext = EclContext
         self.InternalError = InternalError
         self.DocumentError = DocumentError
         self.lexer: "ErbslandConfigurationLanguage" = self.ErbslandConfigurationLanguage(accept_all_signatures=False)
@@ -68,7 +106,25 @@ class WorkingSet:
         parser.add_argument(
             "-t", "--test", required=False, type=Path, metavar="<file or path>", help="Test file or directory."
         )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            required=False,
+            type=int,
+            default=1,
+            metavar="<count>",
+            help="Number of parallel worker processes. Use 0 for one process per CPU. Default: 1",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignore the cached outcomes from previous runs and test all files.",
+        )
         args = parser.parse_args()
+        if args.jobs < 0:
+            exit("The number of jobs must not be negative.")
+        self.jobs = args.jobs or os.cpu_count() or 1
+        self.use_cache = not args.no_cache
         if args.test:
             path = args.test
             if path.is_dir():
@@ -99,19 +155,15 @@ class WorkingSet:
     def run_tests(self) -> list[Path]:
         failed_files: list[Path] = []
 
-        print(f"Running tests for {len(self.test_files)} files...")
+        expected_outcomes: list[TestOutcome] = []
         for path in self.test_files:
             match: Optional[re.Match] = self.re_name.match(path.name)
             if not match:
                 exit(f"Test file with unexpected filename: {path}")
-            expected_outcome = TestOutcome(match.group(2))
-            try:
-                for token, text in self.lexer.get_tokens(path.read_text()):
-                    if token is Error or token is None or not isinstance(text, str):
-                        raise ValueError("Invalid syntax")
-                outcome = TestOutcome.PASS
-            except Exception:
-                outcome = TestOutcome.FAIL
+            expected_outcomes.append(TestOutcome(match.group(2)))
+
+        print(f"Running tests for {len(self.test_files)} files...")
+        for path, expected_outcome, outcome in zip(self.test_files, expected_outcomes, self._get_outcomes()):
             failed = outcome != expected_outcome
 
             if failed:
@@ -122,6 +174,59 @@ class WorkingSet:
         self._print_summary(len(self.test_files), len(failed_files))
         return failed_files
 
+    def _get_outcomes(self) -> list[TestOutcome]:
+        """
+        Get the outcomes for all test files, in the order of the test files.
+
+        Outcomes are cached by the hash of the file content. The whole cache is discarded if the source of the
+        lexer or of this test tool changes. With `--no-cache`, cached outcomes are ignored but kept for the files
+        outside this run.
+        """
+        lexer_hash = hashlib.sha256(
+            (self.doc_path / "pygments_elcl.py").read_bytes() + Path(__file__).read_bytes()
+        ).hexdigest()
+        cached_outcomes = self._read_cache(lexer_hash)
+        content_hashes = [hashlib.sha256(path.read_bytes()).hexdigest() for path in self.test_files]
+        outcomes: list[Optional[TestOutcome]] = [
+            cached_outcomes.get(content_hash) if self.use_cache else None for content_hash in content_hashes
+        ]
+        paths_to_test = [path for path, outcome in zip(self.test_files, outcomes) if outcome is None]
+        if len(paths_to_test) < len(self.test_files):
+            print(f"Using cached outcomes for {len(self.test_files) - len(paths_to_test)} unchanged files.")
+        tested_outcomes = iter(self._parse_test_files(paths_to_test))
+        outcomes = [outcome if outcome is not None else next(tested_outcomes) for outcome in outcomes]
+        cached_outcomes.update(zip(content_hashes, outcomes))
+        self._write_cache(lexer_hash, cached_outcomes)
+        return outcomes
+
+    def _parse_test_files(self, paths: list[Path]) -> list[TestOutcome]:
+        """Parse the given test files and return the outcomes in the same order."""
+        jobs = min(self.jobs, len(paths))
+        if jobs <= 1:
+            return [parse_test_file(self.lexer, path) for path in paths]
+        chunk_size = max(1, len(paths) // (jobs * 8))
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_initialize_worker, initargs=(str(self.doc_path),)
+        ) as executor:
+            return list(executor.map(_parse_test_file_in_worker, paths, chunksize=chunk_size))
+
+    def _read_cache(self, lexer_hash: str) -> dict[str, TestOutcome]:
+        try:
+            cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if cache.get("lexer_hash") != lexer_hash:
+                return {}
+            return {content_hash: TestOutcome(outcome) for content_hash, outcome in cache["outcomes"].items()}
+        except (OSError, ValueError, KeyError, AttributeError):
+            return {}
+
+    def _write_cache(self, lexer_hash: str, outcomes: dict[str, TestOutcome]) -> None:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache = {"lexer_hash": lexer_hash, "outcomes": outcomes}
+            self.cache_path.write_text(json.dumps(cache), encoding="utf-8")
+        except OSError as error:
+            print(f"Could not write the cache file: {error}")
+
     def _print_summary(self, total_tests: int, failed_tests: int) -> None:
         print(f"{'SUCCESS' if failed_tests == 0 else 'FAILED'} : processed {total_tests} tests, {failed_tests} failed.")
 
@@ -158,7 +263,8 @@ class WorkingSet:
             text = path.read_text()
             try:
                 # Read all tokens from the lexer
-                tokens = list(self.lexer.get_tokens_unprocessed(text))
+                context = self.EclContext(text)
+                tokens = list(self.lexer.get_tokens_unprocessed(text, context))
                 # Find the first error token.
                 error: Optional["DocumentError"] = None
                 for pos, token, matched_text in tokens:
@@ -171,15 +277,15 @@ class WorkingSet:
                 # Compare expectations with the outcome.
                 if not error and expected_outcome == TestOutcome.PASS:
                     print("    ERROR: unexpected success, parsing failed document a second time.")
-                self.print_parsed_values()
+                self.print_parsed_values(context.root)
                 if error:
                     raise error
             except (self.InternalError, self.DocumentError) as e:
                 self.print_document_error(e, text)
 
-    def print_parsed_values(self) -> None:
+    def print_parsed_values(self, root: "Value") -> None:
         print("Parsed Values:")
-        for value in self.lexer.last_root.all_values():
+        for value in root.all_values():
             path: str = ".".join(value.path)
             print(f"{path}: {value}")
 
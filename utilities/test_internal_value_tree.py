@@ -0,0 +1,128 @@
+#  Copyright (c) 2025. Erbsland DEV. https://erbsland.dev
+#  SPDX-License-Identifier: Apache-2.0
+
+"""
+This is the internal testing tool for the features around the value tree of the Pygments lexer, that can't be
+expressed as a single test file from the `tests` directory, such as the value tree cache.
+"""
+
+import sys
+import tempfile
+import traceback
+from pathlib import Path
+from typing import Callable, List
+
+
+class WorkingSet:
+
+    def __init__(self) -> None:
+        self._initialize_lexer()
+
+    def _initialize_lexer(self) -> None:
+        doc_path: Path = Path(__file__).parent.parent / "doc" / "_ext"
+        if not doc_path.is_dir():
+            exit(f"Missing `doc` directory: {doc_path}")
+        sys.path.append(str(doc_path))
+        from pygments_elcl import ErbslandConfigurationLanguage, DocumentError, IncludeResolver, ValueTreeCache
+
+        self.ErbslandConfigurationLanguage = ErbslandConfigurationLanguage
+        self.DocumentError = DocumentError
+        self.IncludeResolver = IncludeResolver
+        self.ValueTreeCache = ValueTreeCache
+
+    def run(self) -> None:
+        tests: List[Callable[[Path], None]] = [
+            self.test_cache_big_time_delta,
+            self.test_include_errors,
+            self.test_include_nesting_level,
+            self.test_diagnostics_after_incomplete_value,
+            self.test_value_by_path_in_section_list,
+        ]
+        failed_tests: int = 0
+        for test in tests:
+            try:
+                with tempfile.TemporaryDirectory() as directory:
+                    test(Path(directory))
+            except Exception:
+                failed_tests += 1
+                print(f"Test {test.__name__}")
+                print(f"    ERROR: {traceback.format_exc()}")
+        print(f"{'SUCCESS' if failed_tests == 0 else 'FAILED'} : processed {len(tests)} tests, {failed_tests} failed.")
+        if failed_tests:
+            exit(1)
+
+    def test_cache_big_time_delta(self, directory: Path) -> None:
+        # Time deltas are not range checked, the cache must still store and restore them.
+        path = directory / "document.elcl"
+        path.write_text("[main]\nx: 9999999999999999999 s\ny: -9999999999999999999 s\n", encoding="utf-8")
+        cache = self.ValueTreeCache(directory / "cache", self.ErbslandConfigurationLanguage())
+        for _ in range(2):  # Parse and write the cache, then load the tree from the cache.
+            root = cache.get_value_tree(path)
+            assert root.value_by_path(["main", "x"]).data == (9999999999999999999, "s")
+            assert root.value_by_path(["main", "y"]).data == (-9999999999999999999, "s")
+        assert len(list((directory / "cache").iterdir())) == 1
+
+    def test_include_errors(self, directory: Path) -> None:
+        # The reason for a failed include is reported, even without error tracing.
+        (directory / "self.elcl").write_text('@include: "self.elcl"\n', encoding="utf-8")
+        (directory / "one.elcl").write_text('@include: "two.elcl"\n', encoding="utf-8")
+        (directory / "two.elcl").write_text('@include: "one.elcl"\n', encoding="utf-8")
+        (directory / "broken.elcl").write_text("[main]\nvalue: 01\n", encoding="utf-8")
+        (directory / "main.elcl").write_text('@include: "broken.elcl"\n', encoding="utf-8")
+        (directory / "missing.elcl").write_text('@include: "not-there.elcl"\n', encoding="utf-8")
+        lexer = self.ErbslandConfigurationLanguage(include_resolver=self.IncludeResolver())
+        expected_messages = {
+            "self.elcl": "includes itself.",
+            "one.elcl": "includes itself.",
+            "main.elcl": 'broken.elcl" at line 2, column 8: Zero prefix is not allowed',
+            "missing.elcl": 'The included document "not-there.elcl" does not exist.',
+        }
+        for name, expected_message in expected_messages.items():
+            self.assert_document_error(lambda: lexer.get_value_tree_from_file(directory / name), expected_message)
+
+    def test_include_nesting_level(self, directory: Path) -> None:
+        # The main document and four levels of included documents are accepted, a fifth level is an error.
+        for level in range(1, 7):
+            (directory / f"level{level}.elcl").write_text(
+                f'@include: "level{level + 1}.elcl"\n' if level < 6 else "[main]\nvalue: 1\n", encoding="utf-8"
+            )
+        lexer = self.ErbslandConfigurationLanguage(include_resolver=self.IncludeResolver())
+        root = lexer.get_value_tree_from_file(directory / "level2.elcl")
+        assert root.value_by_path(["main", "value"]).data == 1
+        self.assert_document_error(
+            lambda: lexer.get_value_tree_from_file(directory / "level1.elcl"),
+            "Includes are limited to 5 nested documents.",
+        )
+
+    def test_diagnostics_after_incomplete_value(self, directory: Path) -> None:
+        # The section after an incomplete value is parsed, and later errors are still reported.
+        lexer = self.ErbslandConfigurationLanguage()
+        diagnostics = lexer.get_diagnostics('[a]\ny: "unterminated\n[b]\nz: 0x\n[c..d]\nv: 01\n[e]\nw: 01\n')
+        # The text is reported at the next line, values after the broken section name "c..d" are skipped.
+        assert [diagnostic.line for diagnostic in diagnostics] == [3, 4, 5, 8], diagnostics
+        assert diagnostics[0].message == "There is something missing from previous lines.", diagnostics
+        assert lexer.get_diagnostics('[a]\nx: "text\ny: 1\nz: 01\n')[-1].line == 4
+
+    def test_value_by_path_in_section_list(self, directory: Path) -> None:
+        # Names in a section list resolve to the last entry, the indexes of the entries are no names.
+        root = self.ErbslandConfigurationLanguage().get_value_tree("*[list]*\na: 1\n*[list]*\na: 2\n")
+        assert root.value_by_path(["list", "a"]).data == 2
+        assert root.value_by_path(["list", "0"]) is None
+        assert root.value_by_path(["list", "0", "a"]) is None
+
+    def assert_document_error(self, parse: Callable[[], object], expected_message: str) -> None:
+        try:
+            parse()
+        except self.DocumentError as error:
+            assert expected_message in error.message, error.message
+            return
+        raise AssertionError(f"Expected the error: {expected_message}")
+
+
+def main() -> None:
+    ws = WorkingSet()
+    ws.run()
+
+
+if __name__ == "__main__":
+    main()